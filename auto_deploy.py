@@ -5,48 +5,24 @@ Handles automatic deployment from GitHub to Replit with evidence updates
 """
 
 import os
-import json
 import subprocess
 import time
 from datetime import datetime
 from pathlib import Path
 from github_replit_sync import GitHubReplitSync
 from evidence_updater import EvidenceUpdater
+from single_flight import single_flight, COALESCED
+from deploy_log import DeployLog
 
 class AutoDeploy:
     def __init__(self):
         self.sync = GitHubReplitSync()
         self.evidence = EvidenceUpdater()
-        self.deploy_log = "deploy_log.json"
+        self.deploy_log = DeployLog()
         
     def log_deployment(self, status, details):
-        """Log deployment activity"""
-        log_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'status': status,
-            'details': details
-        }
-        
-        # Load existing log
-        log_file = Path(self.deploy_log)
-        if log_file.exists():
-            try:
-                with open(log_file, 'r') as f:
-                    log_data = json.load(f)
-            except:
-                log_data = []
-        else:
-            log_data = []
-        
-        # Add new entry
-        log_data.append(log_entry)
-        
-        # Keep only last 50 entries
-        log_data = log_data[-50:]
-        
-        # Save log
-        with open(log_file, 'w') as f:
-            json.dump(log_data, f, indent=2)
+        """Log deployment activity (append-only JSON Lines)"""
+        self.deploy_log.append(status, details)
         
         print(f"📝 {status}: {details}")
     
@@ -105,8 +81,9 @@ class AutoDeploy:
             print(f"❌ Deployment failed: {e}")
             return False
     
+    @single_flight('deploy')
     def full_update_cycle(self):
-        """Complete update cycle: evidence → database → git → replit"""
+        """Complete update cycle: evidence → database → git → replit (single-flight)"""
         print("🔄 Full Update Cycle Starting")
         print("=" * 40)
         
@@ -220,19 +197,17 @@ async def auto_deploy_webhook(request: Request):
     
     def show_logs(self, limit=10):
         """Show recent deployment logs"""
-        log_file = Path(self.deploy_log)
-        if not log_file.exists():
+        if not self.deploy_log.exists():
             print("📝 No deployment logs found")
             return
         
         try:
-            with open(log_file, 'r') as f:
-                logs = json.load(f)
+            logs = self.deploy_log.tail(limit)
             
-            print(f"📊 Last {min(limit, len(logs))} Deployment Logs:")
+            print(f"📊 Last {len(logs)} Deployment Logs:")
             print("=" * 50)
             
-            for log in logs[-limit:]:
+            for log in logs:
                 timestamp = log['timestamp'][:19].replace('T', ' ')
                 status = log['status'].upper()
                 details = log['details']
@@ -278,6 +253,9 @@ def main():
         
         if command == "--cycle":
             success = deployer.full_update_cycle()
+            if success is COALESCED:
+                print("ℹ️ Update cycle coalesced: the pending run will pick up these changes, nothing ran now")
+                sys.exit(0)
             sys.exit(0 if success else 1)
             
         elif command == "--deploy":
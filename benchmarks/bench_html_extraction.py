@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+HTML Text Extraction Benchmark
+BeautifulSoup/html.parser (previous behaviour) vs the lxml and streaming extractors
+over the Gmail HTML exports and GMAIL_EVIDENCE/index.html
+"""
+
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from html_text import EXTRACTORS
+
+def load_documents():
+    paths = sorted((REPO_ROOT / "GMAIL_EVIDENCE").rglob("*.html"))
+    return [p.read_text(encoding='utf-8', errors='ignore') for p in paths]
+
+def run(rounds=3):
+    documents = load_documents()
+    total_mb = sum(len(d.encode('utf-8')) for d in documents) / (1024 * 1024)
+    print(f"📊 {len(documents)} HTML documents, {total_mb:.1f} MB (best of {rounds})")
+
+    reference = None
+    baseline = None
+    for name, extractor_class in EXTRACTORS.items():
+        try:
+            extractor = extractor_class()
+        except ImportError as e:
+            print(f"   {name:<8} skipped ({e})")
+            continue
+
+        best = None
+        for _ in range(rounds):
+            start = time.perf_counter()
+            texts = [extractor.extract(d) for d in documents]
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        if reference is None:
+            reference, baseline = texts, best
+        mismatches = sum(a != b for a, b in zip(reference, texts))
+        print(f"   {name:<8} {best:>7.3f}s  {len(documents) / best:>8.1f} docs/s  "
+              f"{total_mb / best:>6.1f} MB/s  {baseline / best:>5.1f}x  "
+              f"{mismatches} mismatch(es) vs bs4")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+OCR Throughput Benchmark
+Images/min for full-resolution OCR vs pre-scaled OCR, serial and through the
+extraction process pool, over the repository's PNG/JPEG evidence
+"""
+
+import os
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from text_extraction import ExtractCache, ExtractStats, ImageOcr, extract_texts
+
+EVIDENCE_TREES = [REPO_ROOT / "GMAIL_EVIDENCE", REPO_ROOT / "NON_GMAIL_EVIDENCE"]
+
+class FullResolutionOcr(ImageOcr):
+    """Previous-style OCR input: grayscale only, no scaling or blank skipping"""
+
+    def prepare(self, path):
+        from PIL import Image
+        image = Image.open(path)
+        return image.convert('L'), image.size
+
+def find_images(limit):
+    images = sorted(p for tree in EVIDENCE_TREES if tree.exists()
+                    for p in tree.rglob("*") if p.suffix.lower() in ('.png', '.jpg', '.jpeg'))
+    return images[:limit] if limit else images
+
+def report(label, seconds, count):
+    print(f"   {label:<30} {seconds:>8.2f}s  {count / seconds * 60:>8.1f} images/min")
+
+def run(limit=None):
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+    except Exception as e:
+        print(f"❌ tesseract is not available ({e})")
+        return False
+
+    limit = limit or int(os.getenv('OCR_BENCH_LIMIT', 40))
+    images = find_images(limit)
+    print(f"📊 {len(images)} images")
+
+    results = {}
+    for label, engine in (("full resolution, serial", FullResolutionOcr()), ("pre-scaled, serial", ImageOcr())):
+        start = time.perf_counter()
+        confidences = []
+        for path in images:
+            try:
+                _, meta = engine.extract(path, 0)
+            except Exception:
+                continue
+            if meta.get('confidence') is not None:
+                confidences.append(meta['confidence'])
+        report(label, time.perf_counter() - start, len(images))
+        results[label] = sum(confidences) / len(confidences) if confidences else 0.0
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        stats = ExtractStats()
+        documents = [(f"bench-{i}", path, path.suffix.lower()) for i, path in enumerate(images)]
+        extract_texts(documents, lambda *_: None, cache=ExtractCache(cache_dir), stats=stats)
+        report("pre-scaled, process pool", stats.seconds, len(images))
+
+    print("\nMean word confidence:")
+    for label, confidence in results.items():
+        print(f"   {label:<30} {confidence:>6.1f}")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if run() else 1)
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Search Response Serialization Benchmark
+Compares rows/sec of the Pydantic + stdlib json path against the orjson fast path
+"""
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from main import SearchResult, SearchResponse, build_search_payload, FastJSONResponse
+
+def make_rows(count):
+    """Build synthetic rows shaped like search.text_search output"""
+    body = "Water damage on bedroom wall reported to Areal Property, unit 1803/243 Franklin St. " * 6
+    return [(i, f"20250416-Re_Urgent_ Water Damage-{i}.eml", body, 0.5 + (i % 50) / 100) for i in range(count)]
+
+def serialize_before(query, rows):
+    """Original path: one SearchResult per row, response_model re-validation, stdlib json"""
+    results = [
+        SearchResult(
+            id=row[0],
+            filename=row[1],
+            preview=row[2][:200] + "..." if len(row[2]) > 200 else row[2],
+            score=float(row[3])
+        )
+        for row in rows
+    ]
+    response = SearchResponse(query=query, results=results, count=len(results))
+    validated = SearchResponse.model_validate(response.model_dump())
+    return json.dumps(jsonable_encoder(validated)).encode('utf-8')
+
+def serialize_after(query, rows):
+    """Fast path: rows straight to dicts, rendered by FastJSONResponse"""
+    return FastJSONResponse(content=build_search_payload(query, rows)).body
+
+def run(batch_size=5000, rounds=20):
+    rows = make_rows(batch_size)
+
+    print(f"📊 Serializing {batch_size} rows x {rounds} rounds")
+    for label, fn in (("before (pydantic + json)", serialize_before),
+                      ("after (orjson fast path)", serialize_after)):
+        fn("water damage", rows)  # warm-up
+        start = time.perf_counter()
+        for _ in range(rounds):
+            fn("water damage", rows)
+        elapsed = time.perf_counter() - start
+        print(f"   {label:<28} {batch_size * rounds / elapsed:>12,.0f} rows/sec")
+
+if __name__ == "__main__":
+    run(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Shared PostgreSQL Connection Pool for VCAT Evidence Repository
+Thread-safe pool so API endpoints reuse connections instead of reconnecting
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from psycopg2 import pool as pg_pool
+
+DB_CONFIG = {
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'database': os.getenv('DB_NAME', 'vcat'),
+    'user': os.getenv('DB_USER', 'vcat'),
+    'password': os.getenv('DB_PASSWORD', 'secret123'),
+    'port': int(os.getenv('DB_PORT', 5432))
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """Create the process-wide pool on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = pg_pool.ThreadedConnectionPool(
+                minconn=int(os.getenv('DB_POOL_MIN', 1)),
+                maxconn=int(os.getenv('DB_POOL_MAX', 5)),
+                connect_timeout=5,
+                **DB_CONFIG
+            )
+        return _pool
+
+@contextmanager
+def pooled_connection():
+    """Borrow a connection from the pool and always hand it back"""
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn, close=bool(conn.closed))
+
+def close_pool():
+    """Close all pooled connections"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
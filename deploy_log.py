@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Deployment Log for VCAT Evidence Repository
+Append-only JSON Lines log with size-based rotation and seek-based tailing
+"""
+
+import os
+import json
+import fcntl
+from datetime import datetime
+from pathlib import Path
+
+class DeployLog:
+    def __init__(self, log_file=None, max_bytes=None, backups=None):
+        self.log_file = Path(log_file or os.getenv('DEPLOY_LOG_FILE', 'deploy_log.jsonl'))
+        self.max_bytes = max_bytes or int(os.getenv('DEPLOY_LOG_MAX_BYTES', 1024 * 1024))
+        self.backups = backups if backups is not None else int(os.getenv('DEPLOY_LOG_BACKUPS', 5))
+        self.legacy_file = self.log_file.with_suffix('.json')
+        self._migrate_legacy()
+
+    def _migrate_legacy(self):
+        """Convert the old whole-file deploy_log.json into JSON Lines once"""
+        if not self.legacy_file.exists() or self.log_file.exists():
+            return
+        try:
+            with open(self.legacy_file, 'r') as f:
+                entries = json.load(f)
+            with open(self.log_file, 'w') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + "\n")
+            self.legacy_file.rename(self.legacy_file.with_name(self.legacy_file.name + '.migrated'))
+        except Exception as e:
+            print(f"⚠️ Could not migrate {self.legacy_file}: {e}")
+
+    def _rotated(self, index):
+        return self.log_file.with_name(f"{self.log_file.name}.{index}")
+
+    def _rotate(self):
+        """Shift deploy_log.jsonl -> .1 -> .2 ..., dropping the oldest"""
+        if self.backups <= 0:
+            self.log_file.unlink(missing_ok=True)
+            return
+        self._rotated(self.backups).unlink(missing_ok=True)
+        for index in range(self.backups - 1, 0, -1):
+            if self._rotated(index).exists():
+                self._rotated(index).rename(self._rotated(index + 1))
+        self.log_file.rename(self._rotated(1))
+
+    def append(self, status, details):
+        """Append one entry; constant time regardless of log size"""
+        entry = {
+            'timestamp': datetime.now().isoformat(),
+            'status': status,
+            'details': details
+        }
+        line = (json.dumps(entry, default=str) + "\n").encode('utf-8')
+
+        while True:
+            f = open(self.log_file, 'ab')
+            fcntl.flock(f, fcntl.LOCK_EX)
+            # Another process may have rotated the file while we waited for the lock
+            try:
+                current = os.fstat(f.fileno()).st_ino == os.stat(self.log_file).st_ino
+            except FileNotFoundError:
+                current = False
+            if current:
+                break
+            fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+
+        try:
+            f.write(line)
+            f.flush()
+            if f.tell() >= self.max_bytes:
+                self._rotate()
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+            f.close()
+
+        return entry
+
+    @staticmethod
+    def _tail_file(path, limit, block_size=8192):
+        """Read the last `limit` lines of a file by seeking backwards from the end"""
+        try:
+            with open(path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                position = f.tell()
+                data = b''
+                while position > 0 and data.count(b'\n') <= limit:
+                    read_size = min(block_size, position)
+                    position -= read_size
+                    f.seek(position)
+                    data = f.read(read_size) + data
+        except FileNotFoundError:
+            return []
+
+        lines = [line for line in data.split(b'\n') if line.strip()]
+        return lines[-limit:] if limit else []
+
+    def tail(self, limit=20):
+        """Most recent `limit` entries, oldest first, spanning rotated files"""
+        entries = []
+        for path in [self.log_file] + [self._rotated(i) for i in range(1, self.backups + 1)]:
+            needed = limit - len(entries)
+            if needed <= 0:
+                break
+            parsed = []
+            for line in self._tail_file(path, needed):
+                try:
+                    parsed.append(json.loads(line))
+                except ValueError:
+                    continue
+            entries = parsed + entries
+        return entries[-limit:] if limit else []
+
+    def exists(self):
+        return self.log_file.exists() or self._rotated(1).exists()
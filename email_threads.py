@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Email Thread Index for VCAT Evidence Repository
+Message-ID / In-Reply-To / References per email in evidence.email_messages, with a
+trigger that assigns every message to its conversation (thread_id) as rows arrive
+"""
+
+import re
+
+# Threads are connected components over Message-ID links; each is labelled with the
+# smallest root id (first References entry, else In-Reply-To, else own Message-ID) of
+# its members, so the label does not depend on load order. A message that joins two
+# threads relabels the other one.
+INSTALL_SQL = """
+CREATE TABLE IF NOT EXISTS evidence.email_messages (
+    email_hash text PRIMARY KEY,
+    message_id text,
+    in_reply_to text,
+    reference_ids text[] NOT NULL DEFAULT '{}',
+    thread_id text NOT NULL
+);
+CREATE INDEX IF NOT EXISTS email_messages_message_id_idx ON evidence.email_messages (message_id);
+CREATE INDEX IF NOT EXISTS email_messages_in_reply_to_idx ON evidence.email_messages (in_reply_to);
+CREATE INDEX IF NOT EXISTS email_messages_reference_ids_idx ON evidence.email_messages USING gin (reference_ids);
+CREATE INDEX IF NOT EXISTS email_messages_thread_idx ON evidence.email_messages (thread_id);
+
+CREATE OR REPLACE FUNCTION evidence.email_messages_thread_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+    parents text[] := array_remove(ARRAY[NEW.in_reply_to] || NEW.reference_ids, NULL);
+    related text[];
+BEGIN
+    -- Threads of this message's ancestors and of replies to it that were loaded first
+    SELECT array_agg(DISTINCT m.thread_id) INTO related
+    FROM evidence.email_messages m
+    WHERE m.message_id = ANY(parents)
+       OR m.in_reply_to = NEW.message_id
+       OR m.reference_ids @> ARRAY[NEW.message_id];
+
+    NEW.thread_id := COALESCE(NEW.reference_ids[1], NEW.in_reply_to, NEW.message_id, NEW.email_hash);
+    IF related IS NOT NULL THEN
+        SELECT min(t) INTO NEW.thread_id FROM unnest(related || NEW.thread_id) AS t;
+        UPDATE evidence.email_messages SET thread_id = NEW.thread_id
+        WHERE thread_id = ANY(related) AND thread_id <> NEW.thread_id;
+    END IF;
+    RETURN NEW;
+END
+$$;
+
+DROP TRIGGER IF EXISTS email_messages_thread ON evidence.email_messages;
+CREATE TRIGGER email_messages_thread
+    BEFORE INSERT ON evidence.email_messages
+    FOR EACH ROW EXECUTE FUNCTION evidence.email_messages_thread_trigger();
+"""
+
+# Insert column order (thread_id is filled in by the trigger)
+MESSAGE_COLUMNS = ('email_hash', 'message_id', 'in_reply_to', 'reference_ids')
+
+MESSAGE_ID_PATTERN = re.compile(r'<([^<>\s]+)>')
+
+def message_ids(value):
+    """Angle-bracketed ids in a header value, in order, without duplicates"""
+    ids = []
+    for match in MESSAGE_ID_PATTERN.findall(str(value or '')):
+        if match not in ids:
+            ids.append(match)
+    return ids
+
+def thread_record(email_hash, headers):
+    """evidence.email_messages row for one parsed header block"""
+    own = message_ids(headers.get('Message-ID'))
+    in_reply_to = message_ids(headers.get('In-Reply-To'))
+    return (
+        email_hash,
+        own[0] if own else None,
+        in_reply_to[0] if in_reply_to else None,
+        message_ids(headers.get('References'))
+    )
+
+def install_thread_index(conn):
+    """Create evidence.email_messages and its threading trigger (idempotent)"""
+    with conn.cursor() as cursor:
+        cursor.execute(INSTALL_SQL)
+    conn.commit()
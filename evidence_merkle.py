@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Merkle-Tree Evidence Manifest for VCAT Evidence Repository
+Per-directory and per-file hashes so manifest diffs only descend into changed subtrees
+"""
+
+import hashlib
+
+# Node layout (kept short for a compact JSON manifest):
+#   {"h": <directory hash>, "d": {name: <child directory node>}, "f": {name: <file sha256>}}
+
+def _seal(node):
+    """Compute a directory node's hash from its sorted children"""
+    hasher = hashlib.sha256()
+    for name in sorted(node['d']):
+        hasher.update(f"d {name} {node['d'][name]['h']}\n".encode())
+    for name in sorted(node['f']):
+        hasher.update(f"f {name} {node['f'][name]}\n".encode())
+    node['h'] = hasher.hexdigest()
+    return node['h']
+
+def build_tree(files):
+    """Build a Merkle tree from {relative/path: sha256}"""
+    root = {'h': None, 'd': {}, 'f': {}}
+    for relpath, digest in files.items():
+        parts = relpath.replace('\\', '/').split('/')
+        node = root
+        for part in parts[:-1]:
+            node = node['d'].setdefault(part, {'h': None, 'd': {}, 'f': {}})
+        node['f'][parts[-1]] = digest
+
+    def seal_all(node):
+        for child in node['d'].values():
+            seal_all(child)
+        return _seal(node)
+
+    seal_all(root)
+    return root
+
+def iter_files(node, prefix=''):
+    """Yield (relative path, sha256) for every file under a node"""
+    for name, digest in node['f'].items():
+        yield prefix + name, digest
+    for name, child in node['d'].items():
+        yield from iter_files(child, f"{prefix}{name}/")
+
+def count_files(node):
+    return len(node['f']) + sum(count_files(child) for child in node['d'].values())
+
+def diff_trees(old, new, prefix=''):
+    """
+    Added / modified / removed files between two trees. Subtrees whose hashes
+    match are skipped, so cost is proportional to what changed.
+    """
+    changes = {'added': [], 'modified': [], 'removed': []}
+    _diff(old, new, prefix, changes)
+    for kind in changes:
+        changes[kind].sort()
+    return changes
+
+def _diff(old, new, prefix, changes):
+    if old is None:
+        changes['added'].extend(path for path, _ in iter_files(new, prefix))
+        return
+    if new is None:
+        changes['removed'].extend(path for path, _ in iter_files(old, prefix))
+        return
+    if old['h'] == new['h']:
+        return
+
+    for name, digest in new['f'].items():
+        if name not in old['f']:
+            changes['added'].append(prefix + name)
+        elif old['f'][name] != digest:
+            changes['modified'].append(prefix + name)
+    changes['removed'].extend(prefix + name for name in old['f'] if name not in new['f'])
+
+    for name in set(old['d']) | set(new['d']):
+        _diff(old['d'].get(name), new['d'].get(name), f"{prefix}{name}/", changes)
+
+def folder_hashes(node, max_depth=2, prefix=''):
+    """Per-folder hashes (e.g. 01_LEGAL_DOCUMENTS, All_Case_Parties_HTML/Attachments-13)"""
+    hashes = {}
+    if max_depth <= 0:
+        return hashes
+    for name in sorted(node['d']):
+        child = node['d'][name]
+        hashes[prefix + name] = child['h']
+        hashes.update(folder_hashes(child, max_depth - 1, f"{prefix}{name}/"))
+    return hashes
+
+def combined_root(roots):
+    """Single root over several named trees ({name: root hash})"""
+    hasher = hashlib.sha256()
+    for name in sorted(roots):
+        hasher.update(f"d {name} {roots[name]}\n".encode())
+    return hasher.hexdigest()
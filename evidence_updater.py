@@ -5,15 +5,20 @@ Handles automatic updates of evidence data from various sources
 """
 
 import os
-import hashlib
 import psycopg2
 from pathlib import Path
 from datetime import datetime
 import json
 import subprocess
+from single_flight import single_flight, COALESCED
+from file_hasher import hash_file, hash_files, directory_hash, HashStats
+from evidence_merkle import build_tree, diff_trees, folder_hashes, combined_root, count_files
+from load_evidence_data import BASE_DIR, GMAIL_DIR_NAMES, NON_GMAIL_DIR_NAMES, evidence_dir
 
 class EvidenceUpdater:
-    def __init__(self):
+    def __init__(self, source_root=None):
+        # Same root and folder layout the loader ingests (EVIDENCE_ROOT, else this repository)
+        self.source_root = Path(source_root or BASE_DIR)
         self.db_config = {
             'host': 'localhost',
             'database': 'vcat',
@@ -22,38 +27,93 @@ class EvidenceUpdater:
             'port': 5432
         }
         self.evidence_manifest = "evidence_manifest.json"
+        # Local (size, mtime_ns, inode, sha256) per file - not portable, not committed
+        self.stat_cache_file = ".evidence_stat_cache.json"
+        self.last_changes = {}
     
     def get_db_connection(self):
         """Get database connection"""
         return psycopg2.connect(**self.db_config)
     
     def calculate_directory_hash(self, directory):
-        """Calculate hash of all files in directory"""
-        hasher = hashlib.sha256()
-        
-        if not Path(directory).exists():
-            return None
+        """Calculate hash of all files in directory (file contents + paths, walk order)"""
+        return directory_hash(directory)
+    
+    def calculate_file_hash(self, filepath):
+        """SHA-256 of a single file"""
+        return hash_file(filepath)
+    
+    def load_stat_cache(self):
+        """Load per-file stat cache"""
+        cache_file = Path(self.stat_cache_file)
+        if cache_file.exists():
+            try:
+                with open(cache_file, 'r') as f:
+                    return json.load(f)
+            except:
+                pass
+        return {}
+    
+    def save_stat_cache(self, cache):
+        """Save per-file stat cache atomically"""
+        tmp_file = Path(f"{self.stat_cache_file}.tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp_file, self.stat_cache_file)
+    
+    def scan_directory(self, directory, stat_cache, new_cache):
+        """
+        Walk once and return {relative path: sha256}. Files whose
+        (size, mtime_ns, inode) signature matches the stat cache are not re-read.
+        """
+        files = {}
+        to_hash = []
         
-        for root, dirs, files in os.walk(directory):
-            # Sort to ensure consistent ordering
+        for root, dirs, filenames in os.walk(directory):
             dirs.sort()
-            files.sort()
+            filenames.sort()
             
-            for filename in files:
+            for filename in filenames:
                 if filename.startswith('.'):
                     continue
-                    
+                
                 filepath = Path(root) / filename
                 try:
-                    with open(filepath, 'rb') as f:
-                        while chunk := f.read(8192):
-                            hasher.update(chunk)
-                    # Include filename in hash
-                    hasher.update(str(filepath).encode())
-                except:
+                    st = filepath.stat()
+                except OSError:
+                    continue
+                
+                key = str(filepath)
+                signature = [st.st_size, st.st_mtime_ns, st.st_ino]
+                cached = stat_cache.get(key)
+                if cached and cached[:3] == signature:
+                    new_cache[key] = cached
+                    files[str(filepath.relative_to(directory))] = cached[3]
+                else:
+                    to_hash.append((filepath, signature))
+        
+        # Changed files are hashed concurrently
+        if to_hash:
+            stats = HashStats()
+            digests = hash_files([filepath for filepath, _ in to_hash], stats=stats)
+            for filepath, signature in to_hash:
+                digest = digests[filepath]
+                if digest is None:
                     continue
+                new_cache[str(filepath)] = signature + [digest]
+                files[str(filepath.relative_to(directory))] = digest
+            print(f"   Hashed {stats}")
         
-        return hasher.hexdigest()
+        return dict(sorted(files.items())), len(to_hash)
+    
+    @staticmethod
+    def manifest_tree(entry):
+        """Merkle tree of a manifest entry (older per-file manifests are converted)"""
+        if 'tree' in entry:
+            return entry['tree']
+        if 'files' in entry:
+            return build_tree(entry['files'])
+        return None
     
     def load_manifest(self):
         """Load evidence manifest"""
@@ -67,75 +127,190 @@ class EvidenceUpdater:
         return {}
     
     def save_manifest(self, manifest):
-        """Save evidence manifest"""
+        """Save evidence manifest (compact: the Merkle trees dominate its size)"""
         with open(self.evidence_manifest, 'w') as f:
-            json.dump(manifest, f, indent=2)
+            json.dump(manifest, f, separators=(',', ':'), sort_keys=True)
+    
+    @staticmethod
+    def manifest_sources(manifest):
+        """Manifest entries keyed by source folder name (older manifests used relative paths)"""
+        return {Path(dir_path).name: entry for dir_path, entry in manifest.items()}
+    
+    def diff_manifests(self, old_manifest, new_manifest):
+        """Per-source file changes between two manifests (e.g. local vs pulled from GitHub)"""
+        old_manifest = self.manifest_sources(old_manifest)
+        new_manifest = self.manifest_sources(new_manifest)
+        result = {}
+        for dir_path in sorted(set(old_manifest) | set(new_manifest)):
+            old_tree = self.manifest_tree(old_manifest.get(dir_path, {}))
+            new_tree = self.manifest_tree(new_manifest.get(dir_path, {}))
+            if old_tree is None and new_tree is None:
+                continue
+            empty = build_tree({})
+            changes = diff_trees(old_tree or empty, new_tree or empty)
+            if any(changes.values()):
+                result[dir_path] = changes
+        return result
+    
+    def merkle_summary(self, manifest=None, max_depth=2):
+        """Root and per-folder hashes for verification"""
+        manifest = manifest if manifest is not None else self.load_manifest()
+        sources = {}
+        for dir_path, entry in manifest.items():
+            tree = self.manifest_tree(entry)
+            if tree is None:
+                continue
+            sources[Path(dir_path).name] = {
+                'root': tree['h'],
+                'file_count': count_files(tree),
+                'folders': folder_hashes(tree, max_depth)
+            }
+        return {
+            'root': combined_root({name: info['root'] for name, info in sources.items()}),
+            'sources': sources
+        }
     
     def check_evidence_changes(self):
         """Check if evidence files have changed"""
         print("🔍 Checking for evidence changes...")
         
         evidence_dirs = [
-            "../VCAT_GMAIL_EVIDENCE ",
-            "../VCAT_NON_GMAIL_EVIDENCE"
+            evidence_dir(self.source_root, GMAIL_DIR_NAMES),
+            evidence_dir(self.source_root, NON_GMAIL_DIR_NAMES)
         ]
         
-        manifest = self.load_manifest()
+        manifest = self.manifest_sources(self.load_manifest())
+        stat_cache = self.load_stat_cache()
+        new_cache = {}
         current_state = {}
         changes_detected = False
+        self.last_changes = {}
         
-        for evidence_dir in evidence_dirs:
-            dir_path = Path(evidence_dir)
+        for dir_path in evidence_dirs:
             if dir_path.exists():
-                current_hash = self.calculate_directory_hash(dir_path)
-                current_state[str(dir_path)] = {
-                    'hash': current_hash,
+                files, rehashed = self.scan_directory(dir_path, stat_cache, new_cache)
+                tree = build_tree(files)
+                current_state[dir_path.name] = {
+                    'hash': tree['h'],
                     'last_checked': datetime.now().isoformat(),
-                    'file_count': sum(1 for _ in dir_path.rglob('*') if _.is_file())
+                    'file_count': len(files),
+                    'tree': tree
                 }
                 
-                # Check against manifest
-                old_hash = manifest.get(str(dir_path), {}).get('hash')
-                if old_hash != current_hash:
+                # Check against manifest (Merkle diff only descends into changed folders)
+                old_entry = manifest.get(dir_path.name, {})
+                old_tree = self.manifest_tree(old_entry)
+                if old_tree:
+                    changes = diff_trees(old_tree, tree)
+                    changed = any(changes.values())
+                else:
+                    # Manifest written before per-file tracking: compare the legacy hash once
+                    changes = {'added': sorted(files), 'modified': [], 'removed': []}
+                    changed = old_entry.get('hash') != self.calculate_directory_hash(dir_path)
+                
+                print(f"   Scanned {len(files)} files, re-hashed {rehashed}")
+                if changed:
+                    self.last_changes[dir_path.name] = changes
                     print(f"📦 Changes detected in: {dir_path}")
-                    print(f"   Old hash: {old_hash[:8] if old_hash else 'None'}...")
-                    print(f"   New hash: {current_hash[:8] if current_hash else 'None'}...")
+                    for kind, emoji in (('added', '➕'), ('modified', '✏️'), ('removed', '➖')):
+                        for relpath in changes[kind][:20]:
+                            print(f"   {emoji} {relpath}")
+                        if len(changes[kind]) > 20:
+                            print(f"   {emoji} ... {len(changes[kind]) - 20} more {kind}")
                     changes_detected = True
                 else:
                     print(f"✅ No changes in: {dir_path}")
         
+        self.save_stat_cache(new_cache)
         return changes_detected, current_state
     
+    def load_evidence(self):
+        """Run the evidence loader to update the database"""
+        print("📥 Loading evidence into database...")
+        result = subprocess.run(['python3', 'load_evidence_data.py', '--source-root', str(self.source_root)],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"❌ Evidence loading failed: {result.stderr}")
+            return False
+        print("✅ Evidence data updated in database")
+        return True
+    
+    def backfill_search_vectors(self):
+        """
+        Index rows loaded before the search_vector triggers existed (resumable
+        backfill, see search_vectors.py; a no-op once it has finished)
+        """
+        from search_vectors import migrate
+        
+        try:
+            conn = self.get_db_connection()
+        except Exception as e:
+            print(f"❌ Search vector backfill failed: {e}")
+            return False
+        try:
+            migrate(conn)
+            return True
+        except Exception as e:
+            conn.rollback()
+            print(f"❌ Search vector backfill failed: {e}")
+            return False
+        finally:
+            conn.close()
+    
     def create_evidence_backup(self):
         """Create new evidence database backup"""
         print("💾 Creating evidence database backup...")
         
         try:
-            # Run the evidence loader to update database
-            result = subprocess.run(['python3', 'load_evidence_data.py'], 
-                                  capture_output=True, text=True)
+            backup_file = "vcat_database_backup.dump"
+            subprocess.run([
+                'docker', 'exec', 'mygpt-vcat-db',
+                'pg_dump', '-U', 'vcat', '-d', 'vcat',
+                '--format=custom', '--no-owner', '--no-privileges'
+            ], stdout=open(backup_file, 'wb'), check=True)
             
-            if result.returncode == 0:
-                print("✅ Evidence data updated in database")
-                
-                # Create new backup
-                backup_file = "vcat_database_backup.dump"
-                subprocess.run([
-                    'docker', 'exec', 'mygpt-vcat-db',
-                    'pg_dump', '-U', 'vcat', '-d', 'vcat',
-                    '--format=custom', '--no-owner', '--no-privileges'
-                ], stdout=open(backup_file, 'wb'), check=True)
-                
-                print(f"✅ New backup created: {backup_file}")
-                return True
-            else:
-                print(f"❌ Evidence loading failed: {result.stderr}")
-                return False
+            print(f"✅ New backup created: {backup_file}")
+            
+            # Optional directory-format dump for parallel restores
+            if os.getenv('BACKUP_FORMAT', 'custom') == 'directory':
+                self.create_directory_backup()
+            return True
                 
         except Exception as e:
             print(f"❌ Backup creation failed: {e}")
             return False
     
+    def create_directory_backup(self):
+        """Create a directory-format dump (parallel jobs) next to the custom backup"""
+        from parallel_restore import BACKUP_DIRECTORY, restore_jobs
+        import shutil
+        import time
+        
+        print("💾 Creating directory-format backup...")
+        container_dir = "/tmp/vcat_database_backup.dir"
+        jobs = restore_jobs()
+        
+        try:
+            start = time.perf_counter()
+            subprocess.run(['docker', 'exec', 'mygpt-vcat-db', 'rm', '-rf', container_dir], check=True)
+            subprocess.run([
+                'docker', 'exec', 'mygpt-vcat-db',
+                'pg_dump', '-U', 'vcat', '-d', 'vcat',
+                '--format=directory', '--jobs', str(jobs),
+                '--no-owner', '--no-privileges', '-f', container_dir
+            ], check=True)
+            
+            if Path(BACKUP_DIRECTORY).exists():
+                shutil.rmtree(BACKUP_DIRECTORY)
+            subprocess.run(['docker', 'cp', f"mygpt-vcat-db:{container_dir}", BACKUP_DIRECTORY], check=True)
+            
+            print(f"✅ Directory backup created in {time.perf_counter() - start:.1f}s "
+                  f"(jobs={jobs}): {BACKUP_DIRECTORY}")
+            return True
+        except Exception as e:
+            print(f"❌ Directory backup failed: {e}")
+            return False
+    
     def commit_changes_to_git(self, manifest):
         """Commit evidence changes to Git"""
         print("📝 Committing changes to Git...")
@@ -144,6 +319,8 @@ class EvidenceUpdater:
             # Add evidence files and backup
             subprocess.run(['git', 'add', 'vcat_database_backup.dump'], check=True)
             subprocess.run(['git', 'add', 'evidence_manifest.json'], check=True)
+            if Path("vcat_database_backup.dir").exists():
+                subprocess.run(['git', 'add', 'vcat_database_backup.dir'], check=True)
             
             # Create commit message
             file_counts = {dir_path: info['file_count'] 
@@ -181,8 +358,9 @@ Co-Authored-By: Claude <noreply@anthropic.com>"""
             print(f"❌ Git commit failed: {e}")
             return False
     
+    @single_flight('deploy')
     def update_evidence_system(self):
-        """Complete evidence update process"""
+        """Complete evidence update process (single-flight with sync/deploy)"""
         print("🔄 VCAT Evidence Update Process")
         print("=" * 40)
         
@@ -193,6 +371,13 @@ Co-Authored-By: Claude <noreply@anthropic.com>"""
             print("ℹ️ No evidence changes detected")
             return True
         
+        if not self.load_evidence():
+            return False
+        
+        # Rows indexed before the dump so the backup carries search vectors
+        if not self.backfill_search_vectors():
+            return False
+        
         # Create new backup with updated data
         if not self.create_evidence_backup():
             print("❌ Failed to create evidence backup")
@@ -288,11 +473,31 @@ def main():
             
         elif command == "--update":
             success = updater.update_evidence_system()
+            if success is COALESCED:
+                print("ℹ️ Evidence update coalesced: the pending run will pick up these changes, nothing ran now")
+                sys.exit(0)
             sys.exit(0 if success else 1)
             
         elif command == "--status":
             updater.status()
             
+        elif command == "--merkle":
+            print(json.dumps(updater.merkle_summary(), indent=2))
+            
+        elif command == "--diff-manifest":
+            if len(sys.argv) < 3:
+                print("Usage: evidence_updater.py --diff-manifest OTHER_MANIFEST.json")
+                sys.exit(2)
+            with open(sys.argv[2], 'r') as f:
+                other = json.load(f)
+            changes = updater.diff_manifests(updater.load_manifest(), other)
+            print(json.dumps(changes, indent=2))
+            sys.exit(1 if changes else 0)
+            
+        elif command == "--dump-dir":
+            success = updater.create_directory_backup()
+            sys.exit(0 if success else 1)
+            
         elif command == "--stats":
             stats = updater.get_evidence_stats()
             if stats:
@@ -305,6 +510,9 @@ def main():
         print("  --update  Update evidence system")
         print("  --status  Show system status")
         print("  --stats   Show statistics (JSON)")
+        print("  --dump-dir Create directory-format backup (parallel restore)")
+        print("  --merkle  Show Merkle root and per-folder hashes")
+        print("  --diff-manifest FILE  Diff local manifest against another")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
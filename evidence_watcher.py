@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Evidence Watch Mode for VCAT Evidence Repository
+Watches the evidence trees (inotify on Linux, polling elsewhere) and ingests only changed files
+"""
+
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from pathlib import Path
+
+# inotify event flags (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct('iIII')
+
+def iter_files(root):
+    """All non-hidden files under root"""
+    for dirpath, dirs, files in os.walk(root):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for filename in files:
+            if not filename.startswith('.'):
+                yield Path(dirpath) / filename
+
+class InotifyWatcher:
+    """Recursive inotify watcher via libc (no third-party dependency)"""
+
+    def __init__(self, roots):
+        libc_name = ctypes.util.find_library('c')
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        self.roots = [Path(r) for r in roots]
+        for root in self.roots:
+            self._watch_tree(root)
+
+    def _watch_tree(self, directory):
+        for dirpath, dirs, _ in os.walk(directory):
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err == errno.ENOSPC:
+                    raise OSError(err, "inotify watch limit reached (fs.inotify.max_user_watches)")
+                continue
+            self.watches[wd] = Path(dirpath)
+
+    def poll(self, timeout):
+        """Wait up to `timeout` seconds; returns [(path, 'changed'|'deleted')]"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: treat everything as possibly changed
+                events.extend((p, 'changed') for root in self.roots for p in iter_files(root))
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / os.fsdecode(name)
+            if path.name.startswith('.'):
+                continue
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    # New folder (e.g. Attachments-33): watch it and pick up files already inside
+                    self._watch_tree(path)
+                    events.extend((p, 'changed') for p in iter_files(path))
+                elif mask & (IN_MOVED_FROM | IN_DELETE):
+                    events.append((path, 'deleted_tree'))
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                events.append((path, 'changed'))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                events.append((path, 'deleted'))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Portable fallback: diff (size, mtime_ns, inode) snapshots every interval"""
+
+    def __init__(self, roots, interval=2.0):
+        self.roots = [Path(r) for r in roots]
+        self.interval = interval
+        self.snapshot = self._scan()
+        self.last_scan = time.monotonic()
+
+    def _scan(self):
+        snapshot = {}
+        for root in self.roots:
+            for path in iter_files(root):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                snapshot[path] = (st.st_size, st.st_mtime_ns, st.st_ino)
+        return snapshot
+
+    def poll(self, timeout):
+        """Rescan once `interval` has passed since the last scan, else just wait out `timeout`"""
+        wait = self.last_scan + self.interval - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return []
+        time.sleep(max(wait, 0))
+        current = self._scan()
+        self.last_scan = time.monotonic()
+        events = [(p, 'changed') for p, sig in current.items() if self.snapshot.get(p) != sig]
+        events += [(p, 'deleted') for p in self.snapshot if p not in current]
+        self.snapshot = current
+        return events
+
+    def close(self):
+        pass
+
+def create_watcher(roots, force_polling=False):
+    """inotify where available, polling otherwise"""
+    if not force_polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError) as e:
+            print(f"⚠️ inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(roots)
+
+class EvidenceWatchService:
+    """Debounces file events and pushes only the affected files through ingest"""
+
+    def __init__(self, base_dir=None, debounce=None, max_delay=None, force_polling=False):
+        import load_evidence_data
+        self.loader = load_evidence_data
+        self.base_dir = Path(base_dir or load_evidence_data.BASE_DIR)
+        self.roots = [self.base_dir / name for name in
+                      load_evidence_data.GMAIL_DIR_NAMES + load_evidence_data.NON_GMAIL_DIR_NAMES]
+        self.debounce = debounce or float(os.getenv('WATCH_DEBOUNCE', 2.0))
+        self.max_delay = max_delay or float(os.getenv('WATCH_MAX_DELAY', 15.0))
+        self.force_polling = force_polling
+
+    def flush(self, pending):
+        changed = sorted(p for p, kind in pending.items() if kind == 'changed')
+        deleted = sorted(p for p, kind in pending.items() if kind == 'deleted')
+        for path, kind in pending.items():
+            if kind == 'deleted_tree':
+                deleted.extend(p for p in self._known_under(path))
+
+        start = time.perf_counter()
+        result = self.loader.ingest_paths(changed, deleted, base_dir=self.base_dir)
+        if result is None:
+            print("❌ Ingest failed: database unavailable")
+            return False
+
+        ingested, removed = result
+        print(f"✅ Ingested {ingested} file(s), removed {removed} row(s) "
+              f"in {time.perf_counter() - start:.2f}s")
+        return True
+
+    def _known_under(self, directory):
+        """Rows can't be listed from disk once a folder is moved away; ask the database"""
+        conn = self.loader.connect_db()
+        if not conn:
+            return []
+        try:
+            cursor = conn.cursor()
+            prefix = self.loader.like_prefix(str(Path(directory).relative_to(self.base_dir)) + os.sep)
+            cursor.execute("""
+                SELECT file_path FROM evidence.documents WHERE file_path LIKE %s
+                UNION ALL
+                SELECT file_path FROM evidence.emails WHERE file_path LIKE %s
+            """, (prefix, prefix))
+            return [self.base_dir / row[0] for row in cursor.fetchall()]
+        finally:
+            conn.close()
+
+    def run(self):
+        roots = [r for r in self.roots if r.exists()]
+        if not roots:
+            print(f"❌ No evidence directories found under {self.base_dir}")
+            return False
+
+        watcher = create_watcher(roots, self.force_polling)
+        print(f"👀 Watching {', '.join(str(r) for r in roots)} "
+              f"({type(watcher).__name__}, debounce {self.debounce}s)")
+
+        pending = {}
+        first_event = last_event = None
+        try:
+            while True:
+                for path, kind in watcher.poll(timeout=0.5):
+                    if self.loader.classify_evidence_file(path, self.base_dir) or kind == 'deleted_tree':
+                        pending[path] = kind
+                        now = time.monotonic()
+                        first_event = first_event or now
+                        last_event = now
+
+                if not pending:
+                    continue
+                now = time.monotonic()
+                if now - last_event >= self.debounce or now - first_event >= self.max_delay:
+                    batch, pending = pending, {}
+                    first_event = last_event = None
+                    print(f"📦 {len(batch)} evidence change(s) detected")
+                    self.flush(batch)
+        except KeyboardInterrupt:
+            print("\n🛑 Watch stopped")
+        finally:
+            watcher.close()
+        return True
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Watch evidence folders and ingest changes continuously")
+    parser.add_argument('--base-dir', help="Evidence source root (defaults to the loader's BASE_DIR)")
+    parser.add_argument('--poll', action='store_true', help="Force the polling watcher")
+    parser.add_argument('--debounce', type=float, help="Quiet period before a batch is ingested (seconds)")
+    args = parser.parse_args()
+
+    service = EvidenceWatchService(base_dir=args.base_dir, debounce=args.debounce, force_polling=args.poll)
+    sys.exit(0 if service.run() else 1)
+
+if __name__ == "__main__":
+    main()
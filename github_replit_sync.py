@@ -10,29 +10,95 @@ import requests
 import json
 from datetime import datetime
 from pathlib import Path
+import threading
 import psycopg2
+from single_flight import single_flight, COALESCED
+
+# (connect, read) timeouts for GitHub API calls
+GITHUB_TIMEOUT = (float(os.getenv('GITHUB_CONNECT_TIMEOUT', 3.05)),
+                  float(os.getenv('GITHUB_READ_TIMEOUT', 10)))
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+def get_http_session():
+    """Shared keep-alive session for GitHub API calls"""
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            session = requests.Session()
+            session.headers.update({
+                'Accept': 'application/vnd.github+json',
+                'User-Agent': 'VCAT-Evidence-Repository-Sync'
+            })
+            token = os.getenv('GITHUB_TOKEN')
+            if token:
+                session.headers['Authorization'] = f"Bearer {token}"
+            _http_session = session
+        return _http_session
 
 class GitHubReplitSync:
     def __init__(self):
         self.github_repo = "ck999kk/VCAT-Evidence-Repository"
-        self.github_api = f"https://api.github.com/repos/{self.github_repo}"
+        self.github_api_base = os.getenv('GITHUB_API_URL', 'https://api.github.com').rstrip('/')
+        self.github_api = f"{self.github_api_base}/repos/{self.github_repo}"
         self.local_version_file = ".github_version"
+        self.commit_cache_file = os.getenv('GITHUB_COMMIT_CACHE', '.github_commit_cache.json')
+        
+    def load_commit_cache(self):
+        """Last GitHub commit lookup (ETag + result) cached on disk"""
+        cache_file = Path(self.commit_cache_file)
+        if cache_file.exists():
+            try:
+                with open(cache_file, 'r') as f:
+                    return json.load(f)
+            except:
+                pass
+        return {}
+    
+    def save_commit_cache(self, cache):
+        """Persist the commit cache atomically"""
+        # Per-writer temp name: concurrent processes/threads must not share one
+        tmp_file = Path(f"{self.commit_cache_file}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_file, self.commit_cache_file)
         
     def get_latest_github_commit(self):
-        """Get latest commit SHA from GitHub"""
+        """Get latest commit SHA from GitHub (conditional request, 304 costs no rate limit)"""
+        cache = self.load_commit_cache()
+        url = f"{self.github_api}/commits/main"
+        headers = {}
+        if cache.get('url') == url and cache.get('etag') and cache.get('commit'):
+            headers['If-None-Match'] = cache['etag']
+        
         try:
-            response = requests.get(f"{self.github_api}/commits/main")
+            response = get_http_session().get(url, headers=headers, timeout=GITHUB_TIMEOUT)
+            if response.status_code == 304:
+                return cache['commit']
             if response.status_code == 200:
                 commit_data = response.json()
-                return {
+                commit = {
                     'sha': commit_data['sha'][:8],
                     'message': commit_data['commit']['message'],
                     'date': commit_data['commit']['committer']['date'],
                     'author': commit_data['commit']['author']['name']
                 }
+                try:
+                    self.save_commit_cache({
+                        'url': url,
+                        'etag': response.headers.get('ETag'),
+                        'commit': commit,
+                        'fetched_at': datetime.now().isoformat()
+                    })
+                except Exception as e:
+                    # The commit was fetched; a cache write failure only costs the next 304
+                    print(f"⚠️ Could not cache GitHub commit: {e}")
+                return commit
+            print(f"❌ GitHub API returned HTTP {response.status_code}")
         except Exception as e:
             print(f"❌ GitHub API error: {e}")
-            return None
+        return None
     
     def get_current_version(self):
         """Get current deployed version"""
@@ -87,10 +153,31 @@ class GitHubReplitSync:
             print(f"❌ Git pull error: {e}")
             return False
     
-    def update_database(self):
-        """Update database if new backup exists"""
-        backup_file = Path("vcat_database_backup.dump")
-        if backup_file.exists():
+    def update_database_incremental(self, backup_file):
+        """Apply only the changed evidence rows from the backup (one transaction)"""
+        from incremental_restore import incremental_update
+        
+        print("📊 Applying incremental database update...")
+        stats = incremental_update(backup_file)
+        for table, counts in stats.items():
+            print(f"   {table}: +{counts['inserted']} ~{counts['updated']} -{counts['deleted']} "
+                  f"({counts['staged']} rows in backup)")
+        print("✅ Database updated incrementally")
+        return True
+    
+    def update_database(self, mode=None):
+        """Update database if new backup exists (incremental by default, full restore as fallback)"""
+        mode = mode or os.getenv('DB_UPDATE_MODE', 'incremental')
+        from parallel_restore import find_backup, restore_backup, RestoreError
+        
+        backup_file = find_backup()
+        if backup_file and mode == 'incremental':
+            try:
+                return self.update_database_incremental(backup_file)
+            except Exception as e:
+                print(f"⚠️ Incremental update not possible ({e}), falling back to full restore")
+        
+        if backup_file:
             print("📊 Updating database from backup...")
             try:
                 # Check if database exists and has data
@@ -109,26 +196,22 @@ class GitHubReplitSync:
                     print(f"   Current database has {current_count} documents")
                     print("   Backing up current data before update...")
                 
-                # Restore from backup
+                # Restore from backup (parallel, indexes built last)
                 env = {**os.environ, 'PGPASSWORD': 'secret123'}
-                result = subprocess.run([
-                    'pg_restore',
-                    '-h', 'localhost',
-                    '-U', 'vcat',
-                    '-d', 'vcat',
-                    '--clean',
-                    '--if-exists',
-                    '--no-owner',
-                    '--no-privileges',
-                    str(backup_file)
-                ], capture_output=True, text=True, env=env)
-                
-                if result.returncode == 0:
-                    print("✅ Database updated successfully")
-                    return True
-                else:
-                    print(f"❌ Database update failed: {result.stderr}")
+                try:
+                    restore_backup(
+                        backup_file,
+                        ['-h', 'localhost', '-U', 'vcat', '-d', 'vcat'],
+                        env=env,
+                        clean=True,
+                        extra_args=['--no-owner', '--no-privileges']
+                    )
+                except RestoreError as e:
+                    print(f"❌ Database update failed: {e}")
                     return False
+                
+                print("✅ Database updated successfully")
+                return True
                     
             except Exception as e:
                 print(f"❌ Database update error: {e}")
@@ -138,7 +221,13 @@ class GitHubReplitSync:
             return True
     
     def restart_service(self):
-        """Restart the application service"""
+        """Restart the application service (graceful reload when supervised)"""
+        from server_supervisor import request_reload
+        
+        if request_reload():
+            print("🔄 Graceful reload requested: new workers take over once ready")
+            return True
+        
         print("🔄 Restarting application...")
         try:
             # Kill existing Python processes
@@ -155,8 +244,9 @@ class GitHubReplitSync:
             print(f"❌ Restart failed: {e}")
             return False
     
+    @single_flight('deploy')
     def sync_from_github(self):
-        """Complete sync process from GitHub"""
+        """Complete sync process from GitHub (single-flight across processes)"""
         print("🔄 GitHub → Replit Sync Process")
         print("=" * 40)
         
@@ -260,6 +350,9 @@ def main():
             
         elif command == "--sync":
             success = sync.sync_from_github()
+            if success is COALESCED:
+                print("ℹ️ Sync coalesced: the pending run will pick up these changes, nothing ran now")
+                sys.exit(0)
             sys.exit(0 if success else 1)
             
         elif command == "--auto":
@@ -269,6 +362,11 @@ def main():
                 sync.sync_from_github()
             sys.exit(0)
             
+        elif command == "--update-db":
+            mode = 'full' if '--full' in sys.argv else 'incremental'
+            success = sync.update_database(mode)
+            sys.exit(0 if success else 1)
+            
         elif command == "--setup":
             sync.setup_auto_sync()
             
@@ -281,6 +379,7 @@ def main():
         print("  --check   Check for updates")
         print("  --sync    Sync from GitHub")
         print("  --auto    Auto-sync (for cron)")
+        print("  --update-db [--full]  Apply backup to database (incremental or full restore)")
         print("  --setup   Setup auto-sync")
         print("  --status  Show sync status")
 
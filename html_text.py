@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Pluggable HTML Text Extraction for VCAT Evidence Repository
+Same text as BeautifulSoup(html, 'html.parser').get_text(' ', strip=True), with faster backends
+"""
+
+import os
+from abc import ABC, abstractmethod
+from html.parser import HTMLParser
+
+# Strings BeautifulSoup keeps out of get_text() (Script, Stylesheet, TemplateString, Ruby* containers)
+NON_TEXT_CONTAINERS = frozenset({'script', 'style', 'template', 'rt', 'rp'})
+
+# Elements html.parser never closes explicitly
+VOID_ELEMENTS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'keygen',
+    'link', 'menuitem', 'meta', 'param', 'source', 'track', 'wbr',
+    'basefont', 'bgsound', 'command', 'frame', 'image', 'isindex', 'nextid', 'spacer'
+})
+
+def join_strings(strings):
+    """get_text(separator=' ', strip=True) over already-split text nodes"""
+    return ' '.join(s for s in (s.strip() for s in strings) if s)
+
+class HTMLTextExtractor(ABC):
+    """Interface: extract(html: str) -> str"""
+
+    name = None
+
+    @abstractmethod
+    def extract(self, html):
+        """Visible text of `html`, joined as get_text(' ', strip=True) would"""
+
+class BeautifulSoupExtractor(HTMLTextExtractor):
+    """Reference implementation (pure-Python tree build)"""
+
+    name = 'bs4'
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+
+    def extract(self, html):
+        return self._soup(html, 'html.parser').get_text(separator=' ', strip=True)
+
+class LxmlExtractor(HTMLTextExtractor):
+    """libxml2's C parser, walked without building Python-level nodes for every string"""
+
+    name = 'lxml'
+
+    def __init__(self):
+        from lxml import etree, html as lxml_html
+        self._etree = etree
+        self._html = lxml_html
+        self._parser = lxml_html.HTMLParser(encoding='utf-8')
+
+    def extract(self, html):
+        etree = self._etree
+        try:
+            root = self._html.document_fromstring(html.encode('utf-8'), parser=self._parser)
+        except (etree.ParserError, ValueError):
+            return ''
+
+        strings = []
+        skip = 0
+        for event, node in etree.iterwalk(root, events=('start', 'end', 'comment', 'pi')):
+            if event == 'start':
+                if node.tag in NON_TEXT_CONTAINERS:
+                    skip += 1
+                if not skip and node.text:
+                    strings.append(node.text)
+            elif event == 'end':
+                if node.tag in NON_TEXT_CONTAINERS:
+                    skip -= 1
+                if not skip and node.tail:
+                    strings.append(node.tail)
+            elif not skip and node.tail:
+                strings.append(node.tail)
+        return join_strings(strings)
+
+class _StreamingTextParser(HTMLParser):
+    """Collects text runs between tags; no tree is kept, only the open-tag stack"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.strings = []
+        self.buffer = []
+        self.open_tags = []
+        self.skip = 0
+
+    def _flush(self):
+        if self.buffer:
+            if not self.skip:
+                self.strings.append(''.join(self.buffer))
+            self.buffer = []
+
+    def handle_starttag(self, tag, attrs):
+        self._flush()
+        if tag in VOID_ELEMENTS:
+            return
+        self.open_tags.append(tag)
+        if tag in NON_TEXT_CONTAINERS:
+            self.skip += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self._flush()
+
+    def handle_endtag(self, tag):
+        self._flush()
+        if tag not in self.open_tags:
+            return
+        # Closing an outer tag implicitly closes everything opened inside it
+        while self.open_tags:
+            closed = self.open_tags.pop()
+            if closed in NON_TEXT_CONTAINERS:
+                self.skip -= 1
+            if closed == tag:
+                break
+
+    def handle_data(self, data):
+        self.buffer.append(data)
+
+    def handle_comment(self, data):
+        self._flush()
+
+    def handle_decl(self, decl):
+        self._flush()
+
+    def handle_pi(self, data):
+        self._flush()
+
+    def unknown_decl(self, data):
+        self._flush()
+        if data.upper().startswith('CDATA[') and not self.skip:
+            self.strings.append(data[len('CDATA['):])
+
+class StreamingExtractor(HTMLTextExtractor):
+    """Standard-library tag stripper; the fallback when lxml is not installed"""
+
+    name = 'stream'
+
+    def extract(self, html):
+        parser = _StreamingTextParser()
+        parser.feed(html)
+        parser.close()
+        parser._flush()
+        return join_strings(parser.strings)
+
+EXTRACTORS = {
+    'bs4': BeautifulSoupExtractor,
+    'lxml': LxmlExtractor,
+    'stream': StreamingExtractor
+}
+
+_extractor = None
+
+def create_extractor(name=None):
+    """Build an extractor by name; 'auto' prefers lxml and falls back to the streaming parser"""
+    name = (name or os.getenv('HTML_EXTRACTOR', 'auto')).lower()
+    if name == 'auto':
+        try:
+            return LxmlExtractor()
+        except ImportError:
+            return StreamingExtractor()
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown HTML extractor '{name}' (choose from auto, {', '.join(EXTRACTORS)})")
+    return EXTRACTORS[name]()
+
+def get_extractor():
+    """Process-wide extractor chosen by HTML_EXTRACTOR"""
+    global _extractor
+    if _extractor is None:
+        _extractor = create_extractor()
+    return _extractor
+
+def extract_text(html):
+    return get_extractor().extract(html)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Incremental Database Update for VCAT Evidence Repository
+Applies only the row-level delta between a pg_dump backup and the live evidence tables
+"""
+
+import os
+import re
+import tempfile
+import subprocess
+import psycopg2
+from psycopg2 import sql
+from db_pool import DB_CONFIG
+
+EVIDENCE_SCHEMA = "evidence"
+EVIDENCE_TABLES = ("documents", "emails")
+KEY_COLUMN = "file_hash"
+
+COPY_HEADER = re.compile(r'^COPY (?:"?(\w+)"?\.)?"?(\w+)"? \((.*)\) FROM stdin;$')
+
+class IncrementalRestoreError(Exception):
+    """Raised when the dump cannot be applied incrementally"""
+
+class CopyBlockReader:
+    """File-like view over one COPY ... FROM stdin block of pg_restore output"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.done = False
+        self.rows = 0
+
+    def readline(self, size=-1):
+        if self.done:
+            return b''
+        line = self.stream.readline()
+        if not line or line in (b'\\.\n', b'\\.\r\n', b'\\.'):
+            self.done = True
+            return b''
+        self.rows += 1
+        return line
+
+    def read(self, size=-1):
+        chunks = []
+        total = 0
+        while size < 0 or total < size:
+            line = self.readline()
+            if not line:
+                break
+            chunks.append(line)
+            total += len(line)
+        return b''.join(chunks)
+
+def _live_columns(cursor, table):
+    """Writable columns of the live table (generated columns excluded)"""
+    cursor.execute("""
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_schema = %s AND table_name = %s AND is_generated = 'NEVER'
+        ORDER BY ordinal_position
+    """, (EVIDENCE_SCHEMA, table))
+    return [row[0] for row in cursor.fetchall()]
+
+def _stage_table(cursor, table, stream, header_columns):
+    """Create a temp copy of the live table and stream the dump rows into it"""
+    stage = f"stage_{table}"
+    cursor.execute(sql.SQL("CREATE TEMP TABLE {} (LIKE {}.{}) ON COMMIT DROP").format(
+        sql.Identifier(stage), sql.Identifier(EVIDENCE_SCHEMA), sql.Identifier(table)))
+
+    reader = CopyBlockReader(stream)
+    cursor.copy_expert(
+        sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(stage),
+            sql.SQL(', ').join(sql.Identifier(c) for c in header_columns)
+        ).as_string(cursor),
+        reader
+    )
+    # Drain anything copy_expert did not consume
+    while reader.readline():
+        pass
+    return stage
+
+def _apply_delta(cursor, table, stage, columns):
+    """Delete, update and insert rows keyed on file_hash; returns counts"""
+    live = sql.SQL("{}.{}").format(sql.Identifier(EVIDENCE_SCHEMA), sql.Identifier(table))
+    stage = sql.Identifier(stage)
+    key = sql.Identifier(KEY_COLUMN)
+    cols = sql.SQL(', ').join(sql.Identifier(c) for c in columns)
+    live_cols = sql.SQL(', ').join(sql.SQL("l.{}").format(sql.Identifier(c)) for c in columns)
+    stage_cols = sql.SQL(', ').join(sql.SQL("s.{}").format(sql.Identifier(c)) for c in columns)
+
+    cursor.execute(sql.SQL("SELECT COUNT(*) FROM {}").format(stage))
+    staged = cursor.fetchone()[0]
+    cursor.execute(sql.SQL("SELECT COUNT(*) FROM {}").format(live))
+    if staged == 0 and cursor.fetchone()[0] > 0:
+        raise IncrementalRestoreError(f"Dump has no rows for {table}, refusing to delete live data")
+
+    cursor.execute(sql.SQL("""
+        DELETE FROM {live} l
+        WHERE l.{key} IS NOT NULL
+          AND NOT EXISTS (SELECT 1 FROM {stage} s WHERE s.{key} = l.{key})
+    """).format(live=live, stage=stage, key=key))
+    deleted = cursor.rowcount
+
+    cursor.execute(sql.SQL("""
+        UPDATE {live} l SET ({cols}) = ({stage_cols})
+        FROM {stage} s
+        WHERE s.{key} = l.{key}
+          AND ({live_cols}) IS DISTINCT FROM ({stage_cols})
+    """).format(live=live, stage=stage, key=key, cols=cols,
+                live_cols=live_cols, stage_cols=stage_cols))
+    updated = cursor.rowcount
+
+    cursor.execute(sql.SQL("""
+        INSERT INTO {live} ({cols})
+        SELECT {stage_cols} FROM {stage} s
+        WHERE NOT EXISTS (SELECT 1 FROM {live} l WHERE l.{key} = s.{key})
+    """).format(live=live, stage=stage, key=key, cols=cols, stage_cols=stage_cols))
+    inserted = cursor.rowcount
+
+    return {'staged': staged, 'inserted': inserted, 'updated': updated, 'deleted': deleted}
+
+def incremental_update(backup_file, db_config=None):
+    """
+    Stream the evidence tables out of a custom-format dump and apply only the
+    changed rows in one transaction. Raises IncrementalRestoreError when the
+    dump or live schema has no file_hash key (callers fall back to a full restore).
+    """
+    db_config = db_config or DB_CONFIG
+    command = ['pg_restore', '--data-only', '--schema', EVIDENCE_SCHEMA]
+    for table in EVIDENCE_TABLES:
+        command += ['--table', table]
+    command += ['-f', '-', str(backup_file)]
+
+    env = {**os.environ, 'PGPASSWORD': db_config.get('password', '')}
+
+    # Connect first so a connection failure never leaves pg_restore running
+    conn = psycopg2.connect(**db_config)
+    # stderr goes to a file: a full stderr pipe would block pg_restore while we read stdout
+    stderr = tempfile.TemporaryFile()
+    process = None
+    stats = {}
+    try:
+        process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=stderr, env=env)
+        cursor = conn.cursor()
+        staged = {}
+
+        for line in iter(process.stdout.readline, b''):
+            match = COPY_HEADER.match(line.decode('utf-8', errors='replace').rstrip('\r\n'))
+            if not match or match.group(2) not in EVIDENCE_TABLES:
+                continue
+
+            table = match.group(2)
+            header_columns = [c.strip().strip('"') for c in match.group(3).split(',')]
+            live_columns = _live_columns(cursor, table)
+            if KEY_COLUMN not in header_columns or KEY_COLUMN not in live_columns:
+                raise IncrementalRestoreError(f"{table} has no {KEY_COLUMN} column in dump or live schema")
+
+            stage = _stage_table(cursor, table, process.stdout, header_columns)
+            # id is local to each database; generated columns are recomputed
+            columns = [c for c in header_columns if c in live_columns and c != 'id']
+            staged[table] = (stage, columns)
+
+        process.stdout.close()
+        if process.wait() != 0:
+            stderr.seek(0)
+            raise IncrementalRestoreError(f"pg_restore failed: {stderr.read().decode(errors='replace')}")
+
+        missing = [t for t in EVIDENCE_TABLES if t not in staged]
+        if missing:
+            raise IncrementalRestoreError(f"Dump has no data for: {', '.join(missing)}")
+
+        for table, (stage, columns) in staged.items():
+            stats[table] = _apply_delta(cursor, table, stage, columns)
+
+        conn.commit()
+        return stats
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        if process is not None and process.poll() is None:
+            process.kill()
+            process.wait()
+        stderr.close()
+        conn.close()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Streaming Ingest Pipeline for VCAT Evidence Repository
+Walker -> process pool of parsers/hashers -> single database writer, with bounded in-flight work
+"""
+
+import os
+import time
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+_DONE = object()
+
+def parse_workers():
+    """Parser processes (PARSE_WORKERS overrides)"""
+    configured = int(os.getenv('PARSE_WORKERS', 0))
+    if configured > 0:
+        return configured
+    return os.cpu_count() or 1
+
+class PipelineStats:
+    """Items through the pipeline and how long the writer waited on parsers"""
+
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.writer_wait = 0.0
+        self.seconds = 0.0
+
+    @property
+    def items_per_second(self):
+        return self.completed / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.completed}/{self.submitted} items in {self.seconds:.2f}s "
+                f"({self.items_per_second:.1f}/s, writer idle {self.writer_wait:.2f}s)")
+
+class ParsePipeline:
+    """
+    `func` runs in worker processes (it must be a picklable module-level
+    function; `initializer` seeds per-process state) and `sink` consumes its
+    results on the calling thread, so the database connection never leaves
+    the writer. At most `depth` items are parsing or waiting to be written at
+    any time: the walker blocks once the writer falls behind, which keeps
+    memory bounded by queue depth.
+    """
+
+    def __init__(self, func, workers=None, depth=None, initializer=None, initargs=()):
+        self.func = func
+        self.initializer = initializer
+        self.initargs = initargs
+        self.workers = workers or parse_workers()
+        self.depth = depth or int(os.getenv('PARSE_QUEUE_DEPTH', 0)) or self.workers * 4
+
+    def run(self, items, sink, stats=None):
+        """Call sink(item, result) for every item; results arrive in completion order"""
+        stats = stats if stats is not None else PipelineStats()
+        start = time.perf_counter()
+
+        if self.workers <= 1:
+            if self.initializer:
+                self.initializer(*self.initargs)
+            for item in items:
+                stats.submitted += 1
+                self._deliver(item, self._call(item), sink, stats)
+            stats.seconds += time.perf_counter() - start
+            return stats
+
+        slots = threading.BoundedSemaphore(self.depth)
+        results = queue.Queue()
+        walker_error = []
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=self.initializer,
+                                 initargs=self.initargs) as executor:
+            def walk():
+                try:
+                    for item in items:
+                        slots.acquire()
+                        future = executor.submit(self.func, *item)
+                        future.add_done_callback(lambda f, item=item: results.put((item, f)))
+                        stats.submitted += 1
+                except BaseException as e:
+                    walker_error.append(e)
+                finally:
+                    results.put(_DONE)
+
+            walker = threading.Thread(target=walk, name='ingest-walker', daemon=True)
+            walker.start()
+
+            walked = False
+            while not walked or stats.completed + stats.failed < stats.submitted:
+                waited = time.perf_counter()
+                entry = results.get()
+                stats.writer_wait += time.perf_counter() - waited
+                if entry is _DONE:
+                    walked = True
+                    continue
+                item, future = entry
+                try:
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"❌ Error processing {item[0]}: {e}")
+                        result = None
+                    self._deliver(item, result, sink, stats)
+                finally:
+                    slots.release()
+            walker.join()
+
+        if walker_error:
+            raise walker_error[0]
+        stats.seconds += time.perf_counter() - start
+        return stats
+
+    def _call(self, item):
+        try:
+            return self.func(*item)
+        except Exception as e:
+            print(f"❌ Error processing {item[0]}: {e}")
+            return None
+
+    @staticmethod
+    def _deliver(item, result, sink, stats):
+        if result is None:
+            stats.failed += 1
+        else:
+            stats.completed += 1
+        sink(item, result)
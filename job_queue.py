@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Background Job Queue for VCAT Evidence Repository
+Bounded worker pool for sync/deploy/ingest work with a persisted job file
+"""
+
+import os
+import json
+import fcntl
+import queue
+import threading
+import time
+import uuid
+import logging
+from datetime import datetime
+from pathlib import Path
+from contextlib import contextmanager
+
+from single_flight import COALESCED
+
+logger = logging.getLogger(__name__)
+
+JOB_STATES = ('queued', 'running', 'succeeded', 'failed', 'coalesced')
+FINISHED_STATES = ('succeeded', 'failed', 'coalesced')
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class JobQueue:
+    """
+    One job file shared by every server worker process. Each process runs and
+    updates only the jobs it owns (`owner` pid); every read-merge-write of the
+    file happens under an flock()ed sidecar lock, so workers never drop each
+    other's jobs. Jobs of a process that has died are adopted on start().
+    """
+
+    def __init__(self, job_file=None, workers=None, max_pending=None, history=200):
+        self.job_file = Path(job_file or os.getenv('JOB_QUEUE_FILE', 'job_queue.json'))
+        self.lock_file = self.job_file.with_suffix('.lock')
+        self.workers = workers or int(os.getenv('JOB_WORKERS', 2))
+        self.max_pending = max_pending or int(os.getenv('JOB_MAX_PENDING', 20))
+        self.history = history
+        self.handlers = {}
+        # Jobs owned by this process; the job file holds everyone's
+        self.jobs = {}
+        self._queue = queue.Queue(maxsize=self.max_pending)
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def register(self, job_type, handler):
+        """Register the callable that runs jobs of the given type"""
+        self.handlers[job_type] = handler
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive flock held by one process at a time (callers hold self._lock first)"""
+        self.lock_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_file, 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _all_jobs(self):
+        """Every process's jobs, this process's in-memory state winning (caller holds the file lock)"""
+        jobs = {}
+        if self.job_file.exists():
+            try:
+                with open(self.job_file, 'r') as f:
+                    jobs = {job['id']: job for job in json.load(f)}
+            except Exception as e:
+                logger.error(f"Could not load job file {self.job_file}: {e}")
+        jobs.update(self.jobs)
+        return jobs
+
+    def _write(self, jobs):
+        """Trim finished history and replace the job file atomically (caller holds the file lock)"""
+        finished = [j for j in jobs.values() if j['status'] in FINISHED_STATES]
+        finished.sort(key=lambda j: j['created_at'])
+        for job in finished[:-self.history] if len(finished) > self.history else []:
+            del jobs[job['id']]
+            self.jobs.pop(job['id'], None)
+
+        tmp_file = self.job_file.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(sorted(jobs.values(), key=lambda j: j['created_at']), f, indent=2, default=str)
+        os.replace(tmp_file, self.job_file)
+
+    def _save(self):
+        """Merge this process's jobs into the job file (caller holds self._lock)"""
+        with self._file_lock():
+            self._write(self._all_jobs())
+
+    def start(self):
+        """Start the worker pool and re-queue work left over from a previous run"""
+        if self._threads:
+            return self
+
+        pid = os.getpid()
+        with self._lock, self._file_lock():
+            jobs = self._all_jobs()
+            # Work left over by a process that is gone (restart, crashed worker)
+            pending = sorted((j for j in jobs.values() if j['status'] in ('queued', 'running')
+                              and not (j.get('owner') not in (None, pid) and _process_alive(j['owner']))),
+                             key=lambda j: j['created_at'])
+            for job in pending:
+                if job['status'] == 'running':
+                    logger.warning(f"Job {job['id']} was interrupted by a restart, re-queueing")
+                job['owner'] = pid
+                job['status'] = 'queued'
+                job['started_at'] = None
+                self.jobs[job['id']] = job
+                try:
+                    self._queue.put_nowait(job['id'])
+                except queue.Full:
+                    job['status'] = 'failed'
+                    job['error'] = 'Dropped on restart: queue full'
+            self._write(jobs)
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def submit(self, job_type, payload=None):
+        """Queue a job; raises queue.Full when the pending limit is reached"""
+        if job_type not in self.handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+
+        job = {
+            'id': uuid.uuid4().hex[:12],
+            'type': job_type,
+            'status': 'queued',
+            'owner': os.getpid(),
+            'payload': payload,
+            'created_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'duration_seconds': None,
+            'result': None,
+            'error': None
+        }
+
+        with self._lock:
+            self._queue.put_nowait(job['id'])
+            self.jobs[job['id']] = job
+            self._save()
+
+        return dict(job)
+
+    def _worker(self):
+        while True:
+            job_id = self._queue.get()
+            try:
+                self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job_id):
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if not job:
+                return
+            job['status'] = 'running'
+            job['started_at'] = datetime.now().isoformat()
+            self._save()
+
+        start = time.time()
+        try:
+            result = self.handlers[job['type']](job.get('payload'))
+            if result is COALESCED:
+                # Merged into a run already waiting for the lock; that run does the work
+                status, result, error = 'coalesced', None, None
+            else:
+                status, error = ('succeeded' if result is not False else 'failed'), None
+            logger.info(f"Job {job_id} ({job['type']}) {status}: {result}")
+        except Exception as e:
+            result, status, error = None, 'failed', str(e)
+            logger.error(f"Job {job_id} ({job['type']}) failed: {e}")
+
+        with self._lock:
+            job['status'] = status
+            job['result'] = result if isinstance(result, (bool, int, float, str, dict, list, type(None))) else str(result)
+            job['error'] = error
+            job['finished_at'] = datetime.now().isoformat()
+            job['duration_seconds'] = round(time.time() - start, 3)
+            self._save()
+
+    def get(self, job_id):
+        """Get a single job record (from any worker process)"""
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                with self._file_lock():
+                    job = self._all_jobs().get(job_id)
+            return dict(job) if job else None
+
+    def list_jobs(self, limit=20, status=None):
+        """Most recent jobs first, across all worker processes"""
+        with self._lock, self._file_lock():
+            jobs = [dict(j) for j in self._all_jobs().values() if status is None or j['status'] == status]
+        jobs.sort(key=lambda j: j['created_at'], reverse=True)
+        return jobs[:limit]
+
+    def stats(self):
+        """Job counts per state (all processes) plus this process's pool sizing"""
+        with self._lock, self._file_lock():
+            counts = {state: 0 for state in JOB_STATES}
+            for job in self._all_jobs().values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+        return {
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'pending': self._queue.qsize(),
+            'jobs': counts
+        }
+
+_job_queue = None
+_job_queue_lock = threading.Lock()
+
+def get_job_queue():
+    """Process-wide job queue"""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is None:
+            _job_queue = JobQueue()
+        return _job_queue
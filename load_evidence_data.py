@@ -2,26 +2,38 @@
 """
 VCAT Evidence Data Loader
 Loads evidence files from VCAT_GMAIL_EVIDENCE and VCAT_NON_GMAIL_EVIDENCE into mygpt-vcat-db
+(or GMAIL_EVIDENCE / NON_GMAIL_EVIDENCE when run against this repository)
 """
 
 import os
 import sys
+import json
+import time
+import argparse
 import psycopg2
-import hashlib
+from psycopg2.extras import execute_values
+import mimetypes
 from pathlib import Path
 from datetime import datetime
 import email
 import email.utils
-from bs4 import BeautifulSoup
 import re
+from file_hasher import hash_file
+from html_text import extract_text
+from ingest_pipeline import ParsePipeline, PipelineStats
+from search_vectors import install_search_triggers
+from email_threads import MESSAGE_COLUMNS, install_thread_index, thread_record
+from near_duplicates import install_near_duplicates, index_near_duplicates
+from mime_stream import ContentStore, parse_email_stream, read_headers
+from text_extraction import TEXT_EXTRACTORS, EXTRACTION_TABLE_SQL, ExtractStats, extract_texts
 
-# Database connection using mygpt-vcat-db container
+# Database connection using mygpt-vcat-db container (same DB_* variables as the API)
 DB_CONFIG = {
-    'host': 'localhost',
-    'database': 'vcat', 
-    'user': 'vcat',
-    'password': 'secret123',
-    'port': 5432
+    'host': os.getenv('DB_HOST', 'localhost'),
+    'database': os.getenv('DB_NAME', 'vcat'),
+    'user': os.getenv('DB_USER', 'vcat'),
+    'password': os.getenv('DB_PASSWORD', 'secret123'),
+    'port': int(os.getenv('DB_PORT', 5432))
 }
 
 def connect_db():
@@ -33,11 +45,11 @@ def connect_db():
         print(f"❌ Database connection failed: {e}")
         return None
 
-def parse_email_file(file_path):
-    """Parse .eml file and extract metadata"""
+def parse_email_file(file_path, store=None):
+    """Parse .eml file (streamed) and extract metadata, body and attachments"""
     try:
-        with open(file_path, 'rb') as f:
-            msg = email.message_from_bytes(f.read())
+        parsed = parse_email_stream(file_path, store)
+        msg = parsed.headers
         
         subject = msg.get('Subject', '')
         sender = msg.get('From', '')
@@ -52,21 +64,19 @@ def parse_email_file(file_path):
             except:
                 pass
         
-        # Extract body content
-        body = ""
-        if msg.is_multipart():
-            for part in msg.walk():
-                if part.get_content_type() == "text/plain":
-                    body += part.get_payload(decode=True).decode('utf-8', errors='ignore')
-        else:
-            body = msg.get_payload(decode=True).decode('utf-8', errors='ignore')
+        # Extract body content (text/plain, else the HTML part's text)
+        body = ''.join(parsed.plain)
+        if not body.strip() and parsed.html:
+            body = ' '.join(extract_text(html) for html in parsed.html)
         
         return {
             'subject': subject,
             'sender': sender,
             'recipient': recipient,
             'date': date_parsed,
-            'body': body
+            'body': body,
+            'headers': msg,
+            'attachments': parsed.attachments
         }
     except Exception as e:
         print(f"❌ Error parsing email {file_path}: {e}")
@@ -78,13 +88,11 @@ def parse_html_file(file_path):
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
         
-        soup = BeautifulSoup(content, 'html.parser')
-        
         # Extract title from filename if available
         title = file_path.stem
         
-        # Extract text content
-        text = soup.get_text(separator=' ', strip=True)
+        # Extract text content (HTML_EXTRACTOR picks the backend)
+        text = extract_text(content)
         
         # Try to extract date from filename
         date_match = re.search(r'(\d{8})', file_path.name)
@@ -107,219 +115,788 @@ def parse_html_file(file_path):
         return None
 
 def calculate_file_hash(file_path):
-    """Calculate SHA256 hash of file"""
-    try:
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
-    except Exception as e:
-        print(f"❌ Error calculating hash for {file_path}: {e}")
+    """Calculate SHA256 hash of file (large-buffer / mmap reads)"""
+    digest = hash_file(file_path)
+    if digest is None:
+        print(f"❌ Error calculating hash for {file_path}")
+    return digest
+
+# Evidence source root (EVIDENCE_ROOT or --source-root; defaults to this repository) and layout:
+# the original export folder names first, then the copies checked into the repository
+BASE_DIR = Path(os.getenv('EVIDENCE_ROOT') or Path(__file__).resolve().parent)
+GMAIL_DIR_NAMES = ("VCAT_GMAIL_EVIDENCE ", "GMAIL_EVIDENCE")
+NON_GMAIL_DIR_NAMES = ("VCAT_NON_GMAIL_EVIDENCE", "NON_GMAIL_EVIDENCE")
+EML_DIR_NAME = "All_Case_Parties_EML"
+HTML_DIR_NAME = "All_Case_Parties_HTML"
+
+# Insert column order per table (attachments leave content/document_date empty)
+EMAIL_COLUMNS = (
+    'filename', 'file_path', 'file_hash', 'file_size',
+    'subject', 'sender', 'recipient', 'email_date', 'body_text',
+    'created_at'
+)
+DOCUMENT_COLUMNS = (
+    'filename', 'file_path', 'file_type', 'file_hash', 'file_size',
+    'title', 'content', 'document_date', 'created_at'
+)
+# Attachments streamed out of .eml files, linked to their email by file hash
+EMAIL_ATTACHMENT_COLUMNS = ('email_hash', 'document_hash', 'filename')
+TABLE_COLUMNS = {
+    'evidence.emails': EMAIL_COLUMNS,
+    'evidence.documents': DOCUMENT_COLUMNS,
+    'evidence.email_attachments': EMAIL_ATTACHMENT_COLUMNS,
+    'evidence.email_messages': MESSAGE_COLUMNS
+}
+CONFLICT_TARGETS = {
+    'evidence.email_attachments': '(email_hash, document_hash, filename)',
+    'evidence.email_messages': '(email_hash)'
+}
+# Rows keyed by an email's file_hash, dropped along with the email
+EMAIL_LINK_TABLES = ('evidence.email_attachments', 'evidence.email_messages')
+
+LOADER_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS evidence.email_attachments (
+    email_hash text NOT NULL,
+    document_hash text NOT NULL,
+    filename text NOT NULL,
+    PRIMARY KEY (email_hash, document_hash, filename)
+);
+CREATE INDEX IF NOT EXISTS email_attachments_document_idx ON evidence.email_attachments (document_hash);
+
+CREATE TABLE IF NOT EXISTS evidence.ingest_runs (
+    id serial PRIMARY KEY,
+    source_root text NOT NULL,
+    started_at timestamptz NOT NULL DEFAULT NOW(),
+    checkpointed_at timestamptz,
+    finished_at timestamptz,
+    files_done integer NOT NULL DEFAULT 0
+);
+-- Files committed by an unfinished run; cleared once the run finishes
+CREATE TABLE IF NOT EXISTS evidence.ingest_run_files (
+    run_id integer NOT NULL REFERENCES evidence.ingest_runs ON DELETE CASCADE,
+    file_path text NOT NULL,
+    PRIMARY KEY (run_id, file_path)
+);
+"""
+
+def build_email_record(eml_file, base_dir, file_hash=None, email_data=None):
+    """
+    Hash and parse one .eml file into an evidence.emails row, or None.
+    The parsed headers and attachments are copied into `email_data` if given.
+    """
+    # Calculate file hash (unless the caller already has it)
+    file_hash = file_hash or calculate_file_hash(eml_file)
+    if not file_hash:
         return None
+    
+    # Parse email
+    parsed = parse_email_file(eml_file)
+    if not parsed:
+        return None
+    if email_data is not None:
+        email_data.update(parsed)
+    
+    return (
+        eml_file.name,
+        str(eml_file.relative_to(base_dir)),
+        file_hash,
+        eml_file.stat().st_size,
+        parsed['subject'],
+        parsed['sender'],
+        parsed['recipient'],
+        parsed['date'],
+        parsed['body'],
+        datetime.now()
+    )
 
-def load_evidence_files():
-    """Load all evidence files into database"""
+def build_html_record(html_file, base_dir, file_hash=None):
+    """Hash and parse one Gmail HTML export into an evidence.documents row, or None"""
+    # Calculate file hash (unless the caller already has it)
+    file_hash = file_hash or calculate_file_hash(html_file)
+    if not file_hash:
+        return None
     
-    conn = connect_db()
-    if not conn:
-        return False
+    # Parse HTML
+    html_data = parse_html_file(html_file)
+    if not html_data:
+        return None
     
-    cursor = conn.cursor()
+    return (
+        html_file.name,
+        str(html_file.relative_to(base_dir)),
+        'html',
+        file_hash,
+        html_file.stat().st_size,
+        html_data['title'],
+        html_data['content'],
+        html_data['date'],
+        datetime.now()
+    )
+
+def build_attachment_record(attachment_file, base_dir, file_hash=None):
+    """Hash one attachment into an evidence.documents row, or None"""
+    # Calculate file hash (unless the caller already has it)
+    file_hash = file_hash or calculate_file_hash(attachment_file)
+    if not file_hash:
+        return None
     
-    # Base directories
-    base_dir = Path("/Users/chawakornkamnuansil/Desktop/ALL_FILES_COPY")
-    gmail_dir = base_dir / "VCAT_GMAIL_EVIDENCE "
-    non_gmail_dir = base_dir / "VCAT_NON_GMAIL_EVIDENCE"
+    return (
+        attachment_file.name,
+        str(attachment_file.relative_to(base_dir)),
+        attachment_file.suffix.lower(),
+        file_hash,
+        attachment_file.stat().st_size,
+        attachment_file.stem,
+        None,
+        None,
+        datetime.now()
+    )
+
+def email_linked_rows(eml_file, base_dir, email_hash, email_data):
+    """
+    Rows stored alongside an email: its thread index entry, and per attachment an
+    evidence.documents row (content lives in the attachment store) plus a link row
+    """
+    if not email_data:
+        return []
+    rows = [('evidence.email_messages', thread_record(email_hash, email_data['headers']))]
+    email_path = str(Path(eml_file).relative_to(base_dir))
+    for attachment in email_data['attachments']:
+        filename = attachment['filename']
+        # Names like "Message Thread Franklin Stpdf" carry no suffix; fall back to the MIME type
+        file_type = Path(filename).suffix.lower() or mimetypes.guess_extension(attachment['content_type']) or ''
+        rows.append(('evidence.documents', (
+            filename,
+            f"{email_path}#{filename}",
+            file_type,
+            attachment['file_hash'],
+            attachment['size'],
+            Path(filename).stem,
+            None,
+            None,
+            datetime.now()
+        )))
+        rows.append(('evidence.email_attachments', (email_hash, attachment['file_hash'], filename)))
+    return rows
+
+def record_hash(table, record):
+    """file_hash value of a built record"""
+    return record[TABLE_COLUMNS[table].index('file_hash')]
+
+def insert_record(cursor, table, record):
+    """Insert one row, skipping files already loaded"""
+    columns = TABLE_COLUMNS[table]
+    cursor.execute(f"""
+        INSERT INTO {table} ({', '.join(columns)})
+        VALUES ({', '.join(['%s'] * len(columns))})
+        ON CONFLICT {CONFLICT_TARGETS.get(table, '(file_hash)')} DO NOTHING
+    """, record)
+
+class BulkWriter:
+    """Buffers rows per table and flushes them as multi-row INSERTs"""
+    
+    def __init__(self, cursor, batch_size=None):
+        self.cursor = cursor
+        self.batch_size = batch_size or int(os.getenv('LOAD_BATCH_SIZE', 500))
+        self.buffers = {table: [] for table in TABLE_COLUMNS}
+        self.rows_written = 0
+        self.rows_inserted = 0
+        self.seconds = 0.0
     
-    total_files = 0
-    processed_files = 0
+    def add(self, table, record):
+        self.buffers[table].append(record)
+        if len(self.buffers[table]) >= self.batch_size:
+            self.flush(table)
     
-    print("🔄 Starting evidence data loading...")
+    def flush(self, table=None):
+        """Write buffered rows (one table or all); returns rows actually inserted"""
+        inserted = 0
+        for name in ([table] if table else list(self.buffers)):
+            rows = self.buffers[name]
+            if not rows:
+                continue
+            columns = TABLE_COLUMNS[name]
+            start = time.perf_counter()
+            # One RETURNING row per inserted row (conflicts return nothing), so
+            # the result length is the inserted count; no key is needed back
+            returned = execute_values(self.cursor, f"""
+                INSERT INTO {name} ({', '.join(columns)}) VALUES %s
+                ON CONFLICT {CONFLICT_TARGETS.get(name, '(file_hash)')} DO NOTHING
+                RETURNING 1
+            """, rows, page_size=self.batch_size, fetch=True)
+            self.seconds += time.perf_counter() - start
+            self.rows_written += len(rows)
+            inserted += len(returned)
+            self.buffers[name] = []
+        self.rows_inserted += inserted
+        return inserted
+    
+    @property
+    def rows_per_second(self):
+        return self.rows_written / self.seconds if self.seconds else 0.0
+
+def classify_evidence_file(file_path, base_dir=BASE_DIR):
+    """Which loader handles a path: 'email', 'html', 'attachment' or None"""
+    try:
+        parts = Path(file_path).relative_to(base_dir).parts
+    except ValueError:
+        return None
+    
+    if any(part.startswith('.') for part in parts):
+        return None
+    if parts[0] in NON_GMAIL_DIR_NAMES and len(parts) >= 2:
+        return 'attachment'
+    if len(parts) < 3 or parts[0] not in GMAIL_DIR_NAMES:
+        return None
+    if parts[1] == EML_DIR_NAME and len(parts) == 3 and parts[2].endswith('.eml'):
+        return 'email'
+    if parts[1] == HTML_DIR_NAME:
+        if len(parts) == 3 and parts[2].endswith('.html'):
+            return 'html'
+        if len(parts) > 3 and parts[2].startswith('Attachments'):
+            return 'attachment'
+    return None
+
+EVIDENCE_BUILDERS = {
+    'email': ('evidence.emails', build_email_record),
+    'html': ('evidence.documents', build_html_record),
+    'attachment': ('evidence.documents', build_attachment_record)
+}
+
+# file_hash values already in the database; set per worker process by set_known_hashes
+KNOWN_HASHES = frozenset()
+
+def set_known_hashes(hashes):
+    global KNOWN_HASHES
+    KNOWN_HASHES = frozenset(hashes)
+
+def load_known_hashes(cursor):
+    """Every file_hash already stored in either evidence table"""
+    cursor.execute("""
+        SELECT file_hash FROM evidence.emails WHERE file_hash IS NOT NULL
+        UNION
+        SELECT file_hash FROM evidence.documents WHERE file_hash IS NOT NULL
+    """)
+    return {row[0] for row in cursor.fetchall()}
+
+def build_evidence_record(file_path, kind, base_dir, file_hash=None):
+    """
+    Pipeline worker: hash first and only parse files not already loaded.
+    Returns (table, row or None if already present, file_hash, linked rows), or None on failure.
+    """
+    table, builder = EVIDENCE_BUILDERS[kind]
+    file_hash = file_hash or calculate_file_hash(file_path)
+    if not file_hash:
+        return None
+    if file_hash in KNOWN_HASHES:
+        return table, None, file_hash, []
+    if kind == 'email':
+        email_data = {}
+        record = build_email_record(Path(file_path), Path(base_dir), file_hash, email_data)
+        linked = email_linked_rows(file_path, base_dir, file_hash, email_data)
+    else:
+        record = builder(Path(file_path), Path(base_dir), file_hash)
+        linked = []
+    return (table, record, file_hash, linked) if record else None
+
+# (size, mtime_ns, inode) -> sha256 per source file, so unchanged files are not even re-hashed
+LOAD_STAT_CACHE = os.getenv('LOAD_STAT_CACHE', '.load_stat_cache.json')
+
+def file_signature(file_path):
+    st = Path(file_path).stat()
+    return [st.st_size, st.st_mtime_ns, st.st_ino]
+
+def load_stat_cache():
+    """Load the loader's per-file stat cache"""
+    try:
+        with open(LOAD_STAT_CACHE, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_stat_cache(cache):
+    """Save the stat cache atomically"""
+    tmp_file = f"{LOAD_STAT_CACHE}.tmp"
+    with open(tmp_file, 'w') as f:
+        json.dump(cache, f)
+    os.replace(tmp_file, LOAD_STAT_CACHE)
+
+def evidence_dir(base_dir, names):
+    """First of the layout's folder names present under base_dir (the first name if none is)"""
+    for name in names:
+        if (Path(base_dir) / name).is_dir():
+            return Path(base_dir) / name
+    return Path(base_dir) / names[0]
+
+def walk_evidence_files(base_dir=BASE_DIR):
+    """Yield (path, kind, base_dir) for every loadable file: emails, HTML, attachments, then non-Gmail evidence"""
+    base_dir = Path(base_dir)
+    gmail_dir = evidence_dir(base_dir, GMAIL_DIR_NAMES)
+    html_dir = gmail_dir / HTML_DIR_NAME
+    eml_dir = gmail_dir / EML_DIR_NAME
     
-    # Process Gmail Evidence (.eml files)
-    eml_dir = gmail_dir / "All_Case_Parties_EML"
     if eml_dir.exists():
         print(f"📧 Processing Gmail evidence from {eml_dir}")
-        for eml_file in eml_dir.glob("*.eml"):
-            total_files += 1
-            print(f"Processing: {eml_file.name}")
-            
-            # Parse email
-            email_data = parse_email_file(eml_file)
-            if not email_data:
-                continue
-            
-            # Calculate file hash
-            file_hash = calculate_file_hash(eml_file)
-            if not file_hash:
-                continue
-            
-            try:
-                # Insert into evidence.emails table
-                cursor.execute("""
-                    INSERT INTO evidence.emails (
-                        filename, file_path, file_hash, file_size,
-                        subject, sender, recipient, email_date, body_text,
-                        created_at
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (file_hash) DO NOTHING
-                """, (
-                    eml_file.name,
-                    str(eml_file.relative_to(base_dir)),
-                    file_hash,
-                    eml_file.stat().st_size,
-                    email_data['subject'],
-                    email_data['sender'],
-                    email_data['recipient'],
-                    email_data['date'],
-                    email_data['body'],
-                    datetime.now()
-                ))
-                
-                processed_files += 1
-                
-            except Exception as e:
-                print(f"❌ Error inserting email {eml_file.name}: {e}")
-                continue
+        for eml_file in sorted(eml_dir.glob("*.eml")):
+            yield eml_file, 'email', base_dir
     
-    # Process Gmail Evidence (.html files)
-    html_dir = gmail_dir / "All_Case_Parties_HTML"
     if html_dir.exists():
         print(f"🌐 Processing HTML evidence from {html_dir}")
-        for html_file in html_dir.glob("*.html"):
-            total_files += 1
-            print(f"Processing: {html_file.name}")
-            
-            # Parse HTML
-            html_data = parse_html_file(html_file)
-            if not html_data:
+        for html_file in sorted(html_dir.glob("*.html")):
+            yield html_file, 'html', base_dir
+        
+        print(f"📎 Processing attachments from {html_dir}")
+        for attachment_dir in sorted(html_dir.glob("Attachments*")):
+            if attachment_dir.is_dir():
+                for attachment_file in sorted(attachment_dir.rglob("*")):
+                    if attachment_file.is_file():
+                        yield attachment_file, 'attachment', base_dir
+    
+    # Non-Gmail evidence (PDF, DOCX, images) is stored like attachments
+    non_gmail_dir = evidence_dir(base_dir, NON_GMAIL_DIR_NAMES)
+    if non_gmail_dir.exists():
+        print(f"🗂️ Processing non-Gmail evidence from {non_gmail_dir}")
+        for evidence_file in sorted(non_gmail_dir.rglob("*")):
+            if evidence_file.is_file() and classify_evidence_file(evidence_file, base_dir):
+                yield evidence_file, 'attachment', base_dir
+
+def like_prefix(value):
+    """LIKE pattern matching strings that start with `value` literally"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+
+def delete_email_links(cursor, relative_path, keep_hash=None):
+    """
+    Drop thread and attachment link rows of the email(s) stored at a path, and
+    the attachment documents ("<path>#<name>") no email links to any more.
+    Returns the file_hashes no document row holds after the delete, whose
+    blobs can go once the transaction commits.
+    """
+    for table in EMAIL_LINK_TABLES:
+        cursor.execute(f"""
+            DELETE FROM {table} WHERE email_hash IN
+                (SELECT file_hash FROM evidence.emails WHERE file_path = %s AND file_hash IS DISTINCT FROM %s)
+        """, (relative_path, keep_hash))
+    cursor.execute("""
+        DELETE FROM evidence.documents d
+        WHERE d.file_path LIKE %s
+          AND NOT EXISTS (SELECT 1 FROM evidence.email_attachments a WHERE a.document_hash = d.file_hash)
+        RETURNING d.file_hash
+    """, (like_prefix(f"{relative_path}#"),))
+    removed = [row[0] for row in cursor.fetchall()]
+    if not removed:
+        return []
+    cursor.execute("""
+        SELECT h FROM unnest(%s::text[]) AS h
+        WHERE NOT EXISTS (SELECT 1 FROM evidence.documents WHERE file_hash = h)
+    """, (removed,))
+    return [row[0] for row in cursor.fetchall()]
+
+def ingest_paths(changed_paths, deleted_paths=(), base_dir=BASE_DIR):
+    """
+    Incrementally apply a batch of file changes: parse, hash and insert changed
+    files and drop rows for deleted or replaced files (triggers index new rows).
+    Returns (ingested, deleted) counts.
+    """
+    conn = connect_db()
+    if not conn:
+        return None
+    
+    cursor = conn.cursor()
+    ingested = 0
+    deleted = 0
+    ingested_hashes = []
+    orphaned_blobs = []
+    
+    try:
+        for file_path in deleted_paths:
+            kind = classify_evidence_file(file_path, base_dir)
+            if not kind:
                 continue
-            
-            # Calculate file hash
-            file_hash = calculate_file_hash(html_file)
-            if not file_hash:
+            table = EVIDENCE_BUILDERS[kind][0]
+            relative_path = str(Path(file_path).relative_to(base_dir))
+            if kind == 'email':
+                orphaned_blobs.extend(delete_email_links(cursor, relative_path))
+            cursor.execute(f"DELETE FROM {table} WHERE file_path = %s", (relative_path,))
+            deleted += cursor.rowcount
+        
+        for file_path in changed_paths:
+            file_path = Path(file_path)
+            kind = classify_evidence_file(file_path, base_dir)
+            if not kind or not file_path.is_file():
                 continue
             
+            table, builder = EVIDENCE_BUILDERS[kind]
+            print(f"Processing: {file_path.name}")
+            cursor.execute("SAVEPOINT ingest_file")
             try:
-                # Insert into evidence.documents table
-                cursor.execute("""
-                    INSERT INTO evidence.documents (
-                        filename, file_path, file_type, file_hash, file_size,
-                        title, content, document_date, created_at
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    ON CONFLICT (file_hash) DO NOTHING
-                """, (
-                    html_file.name,
-                    str(html_file.relative_to(base_dir)),
-                    'html',
-                    file_hash,
-                    html_file.stat().st_size,
-                    html_data['title'],
-                    html_data['content'],
-                    html_data['date'],
-                    datetime.now()
-                ))
-                
-                processed_files += 1
-                
+                email_data = {}
+                if kind == 'email':
+                    record = build_email_record(file_path, base_dir, email_data=email_data)
+                else:
+                    record = builder(file_path, base_dir)
+                if not record:
+                    cursor.execute("RELEASE SAVEPOINT ingest_file")
+                    continue
+                file_hash = record_hash(table, record)
+                insert_record(cursor, table, record)
+                for linked_table, linked_record in email_linked_rows(file_path, base_dir, file_hash, email_data):
+                    insert_record(cursor, linked_table, linked_record)
+                ingested_hashes.extend(attachment['file_hash'] for attachment in email_data.get('attachments', []))
+                # A modified file replaces the row stored under its old hash
+                relative_path = str(file_path.relative_to(base_dir))
+                removed = []
+                if kind == 'email':
+                    removed = delete_email_links(cursor, relative_path, keep_hash=file_hash)
+                cursor.execute(f"DELETE FROM {table} WHERE file_path = %s AND file_hash <> %s",
+                               (relative_path, file_hash))
+                cursor.execute("RELEASE SAVEPOINT ingest_file")
+                orphaned_blobs.extend(removed)
+                ingested_hashes.append(file_hash)
+                ingested += 1
             except Exception as e:
-                print(f"❌ Error inserting HTML {html_file.name}: {e}")
+                cursor.execute("ROLLBACK TO SAVEPOINT ingest_file")
+                print(f"❌ Error ingesting {file_path.name}: {e}")
+        
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+    
+    # Blobs are removed only after the rows that pointed at them are committed
+    store = ContentStore()
+    for file_hash in orphaned_blobs:
+        store.remove(file_hash)
+    
+    if ingested_hashes:
+        extract_document_text(file_hashes=ingested_hashes, base_dir=base_dir)
+    if ingested or deleted:
+        cluster_near_duplicates()
+    
+    return ingested, deleted
+
+def open_ingest_run(cursor, source_root, restart=False):
+    """
+    Resume the latest unfinished run over this source root, or start a new one.
+    Returns (run id, relative paths already committed by that run).
+    """
+    if restart:
+        cursor.execute("DELETE FROM evidence.ingest_runs WHERE source_root = %s AND finished_at IS NULL",
+                       (source_root,))
+    cursor.execute("""
+        SELECT id, files_done, checkpointed_at FROM evidence.ingest_runs
+        WHERE source_root = %s AND finished_at IS NULL
+        ORDER BY id DESC LIMIT 1
+    """, (source_root,))
+    row = cursor.fetchone()
+    if not row:
+        cursor.execute("INSERT INTO evidence.ingest_runs (source_root) VALUES (%s) RETURNING id", (source_root,))
+        return cursor.fetchone()[0], set()
+    
+    run_id, files_done, checkpointed_at = row
+    cursor.execute("SELECT file_path FROM evidence.ingest_run_files WHERE run_id = %s", (run_id,))
+    print(f"↪️ Resuming run {run_id}: {files_done} file(s) committed (last checkpoint {checkpointed_at})")
+    return run_id, {path for path, in cursor.fetchall()}
+
+def record_checkpoint(cursor, run_id, relative_paths):
+    """Add committed files to the run's cursor (same transaction as their rows)"""
+    execute_values(cursor, """
+        INSERT INTO evidence.ingest_run_files (run_id, file_path) VALUES %s
+        ON CONFLICT DO NOTHING
+    """, [(run_id, path) for path in relative_paths])
+    cursor.execute("""
+        UPDATE evidence.ingest_runs SET files_done = files_done + %s, checkpointed_at = NOW()
+        WHERE id = %s
+    """, (len(relative_paths), run_id))
+
+def finish_ingest_run(cursor, run_id):
+    cursor.execute("UPDATE evidence.ingest_runs SET finished_at = NOW() WHERE id = %s", (run_id,))
+    cursor.execute("DELETE FROM evidence.ingest_run_files WHERE run_id = %s", (run_id,))
+
+def load_evidence_files(base_dir=BASE_DIR, batch_size=None, workers=None, checkpoint_every=None, restart=False):
+    """
+    Load all evidence files into database (parallel parse, buffered multi-row inserts).
+    Files whose hash is already stored are never parsed; files unchanged since the
+    last run (stat cache) are not even re-hashed.
+    Rows are committed every `checkpoint_every` files together with the run's cursor
+    of processed paths, so an interrupted run resumes after its last checkpoint
+    (`restart` abandons it instead).
+    """
+    
+    conn = connect_db()
+    if not conn:
+        return False
+    
+    base_dir = Path(base_dir)
+    cursor = conn.cursor()
+    writer = BulkWriter(cursor, batch_size)
+    stats = PipelineStats()
+    checkpoint_every = checkpoint_every or int(os.getenv('LOAD_CHECKPOINT_FILES', 200))
+    
+    load_start = time.perf_counter()
+    
+    try:
+        known_hashes = load_known_hashes(cursor)
+        run_id, done_paths = open_ingest_run(cursor, str(base_dir.resolve()), restart)
+        conn.commit()
+    except Exception as e:
+        print(f"❌ Error reading existing file hashes: {e}")
+        cursor.close()
+        conn.close()
+        return False
+    
+    pipeline = ParsePipeline(build_evidence_record, workers=workers,
+                             initializer=set_known_hashes, initargs=(known_hashes,))
+    stat_cache = load_stat_cache()
+    new_cache = {}
+    signatures = {}
+    pending_paths = []
+    unchanged = 0
+    already_loaded = 0
+    resumed = 0
+    
+    print(f"🔄 Starting evidence data loading from {base_dir} "
+          f"({pipeline.workers} parser(s), queue depth {pipeline.depth}, batch size {writer.batch_size}, "
+          f"checkpoint every {checkpoint_every} files, {len(known_hashes)} file hashes already loaded)...")
+    
+    def plan(items):
+        # Unchanged files whose hash is already stored never reach the pool,
+        # nor do files an interrupted run already committed
+        nonlocal unchanged, resumed
+        for file_path, kind, base in items:
+            key = str(file_path)
+            if str(file_path.relative_to(base)) in done_paths:
+                if key in stat_cache:
+                    new_cache[key] = stat_cache[key]
+                resumed += 1
+                continue
+            try:
+                signature = file_signature(file_path)
+            except OSError:
+                continue
+            cached = stat_cache.get(key)
+            digest = cached[3] if cached and cached[:3] == signature else None
+            if digest in known_hashes:
+                new_cache[key] = cached
+                unchanged += 1
                 continue
+            signatures[key] = signature
+            yield file_path, kind, base, digest
     
-    # Process PDF and other attachments
-    if html_dir.exists():
-        print(f"📎 Processing attachments from {html_dir}")
-        for attachment_dir in html_dir.glob("Attachments*"):
-            if attachment_dir.is_dir():
-                for attachment_file in attachment_dir.rglob("*"):
-                    if attachment_file.is_file():
-                        total_files += 1
-                        print(f"Processing: {attachment_file.name}")
-                        
-                        # Calculate file hash
-                        file_hash = calculate_file_hash(attachment_file)
-                        if not file_hash:
-                            continue
-                        
-                        try:
-                            # Insert into evidence.documents table
-                            cursor.execute("""
-                                INSERT INTO evidence.documents (
-                                    filename, file_path, file_type, file_hash, file_size,
-                                    title, created_at
-                                ) VALUES (%s, %s, %s, %s, %s, %s, %s)
-                                ON CONFLICT (file_hash) DO NOTHING
-                            """, (
-                                attachment_file.name,
-                                str(attachment_file.relative_to(base_dir)),
-                                attachment_file.suffix.lower(),
-                                file_hash,
-                                attachment_file.stat().st_size,
-                                attachment_file.stem,
-                                datetime.now()
-                            ))
-                            
-                            processed_files += 1
-                            
-                        except Exception as e:
-                            print(f"❌ Error inserting attachment {attachment_file.name}: {e}")
-                            continue
-    
-    # Commit all changes
-    conn.commit()
-    cursor.close()
-    conn.close()
+    def checkpoint():
+        # Buffered rows, the run cursor and the stat cache move forward together
+        writer.flush()
+        record_checkpoint(cursor, run_id, pending_paths)
+        conn.commit()
+        save_stat_cache({**stat_cache, **new_cache})
+        print(f"💾 Checkpoint: {len(pending_paths)} file(s) committed")
+        pending_paths.clear()
+    
+    def write(item, result):
+        nonlocal already_loaded
+        if not result:
+            return
+        file_path = item[0]
+        table, record, digest, linked = result
+        new_cache[str(file_path)] = signatures.pop(str(file_path)) + [digest]
+        pending_paths.append(str(file_path.relative_to(item[2])))
+        if record is not None:
+            print(f"Processing: {file_path.name}")
+            writer.add(table, record)
+            for linked_table, linked_record in linked:
+                writer.add(linked_table, linked_record)
+        else:
+            already_loaded += 1
+        if len(pending_paths) >= checkpoint_every:
+            checkpoint()
+    
+    # Parsers run in worker processes; only this thread touches the database
+    try:
+        pipeline.run(plan(walk_evidence_files(base_dir)), write, stats)
+    except Exception as e:
+        print(f"❌ Error loading evidence: {e}")
+        print(f"↪️ Run {run_id} stopped; re-run to resume from its last checkpoint")
+        conn.rollback()
+        cursor.close()
+        conn.close()
+        return False
+    
+    total_files = stats.submitted + unchanged + resumed
+    processed_files = stats.completed - already_loaded
+    
+    # Flush remaining rows and close the run
+    try:
+        writer.flush()
+        if pending_paths:
+            record_checkpoint(cursor, run_id, pending_paths)
+        finish_ingest_run(cursor, run_id)
+        conn.commit()
+        save_stat_cache(new_cache)
+    except Exception as e:
+        print(f"❌ Error writing evidence batch: {e}")
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+        conn.close()
     
+    total_seconds = time.perf_counter() - load_start
     print(f"✅ Data loading complete!")
     print(f"📊 Total files found: {total_files}")
     print(f"📊 Files processed: {processed_files}")
+    print(f"📊 Skipped without parsing: {unchanged} unchanged, {already_loaded} hash already loaded, "
+          f"{resumed} committed before resuming")
+    print(f"📊 Rows inserted: {writer.rows_inserted} of {writer.rows_written} "
+          f"(existing file hashes skipped)")
+    print(f"⚡ Parse pipeline: {stats}")
+    print(f"⚡ Write throughput: {writer.rows_per_second:,.0f} rows/sec "
+          f"({writer.seconds:.2f}s in database writes, {total_seconds:.2f}s total, "
+          f"{processed_files / total_seconds if total_seconds else 0:,.0f} files/sec end-to-end)")
     
     return True
 
-def update_search_index():
-    """Update full-text search index"""
+def extract_document_text(file_hashes=None, base_dir=BASE_DIR, workers=None):
+    """
+    Fill `content` for attachments with an extractor (PDF, DOCX, OCR; parallel, cached by file_hash).
+    Documents whose previous extraction had failed parts are re-queued on every call.
+    """
     conn = connect_db()
     if not conn:
         return False
     
     cursor = conn.cursor()
-    
-    print("🔍 Updating full-text search indexes...")
+    base_dir = Path(base_dir)
+    stats = ExtractStats()
+    updated = 0
     
     try:
-        # Update document search vectors
+        cursor.execute(EXTRACTION_TABLE_SQL)
+        # Documents never extracted, plus those whose last extraction lost parts
         cursor.execute("""
-            UPDATE evidence.documents 
-            SET search_vector = to_tsvector('english', 
-                COALESCE(title, '') || ' ' || 
-                COALESCE(content, '') || ' ' || 
-                COALESCE(filename, '')
-            )
-            WHERE search_vector IS NULL
-        """)
+            SELECT d.file_hash, d.file_path, d.file_type FROM evidence.documents d
+            WHERE d.file_type = ANY(%(types)s)
+              AND (d.content IS NULL OR EXISTS (
+                  SELECT 1 FROM evidence.text_extractions x
+                  WHERE x.file_hash = d.file_hash AND x.failed_parts > 0))
+              AND (%(hashes)s::text[] IS NULL OR d.file_hash = ANY(%(hashes)s::text[]))
+            ORDER BY d.file_path
+        """, {'types': list(TEXT_EXTRACTORS), 'hashes': file_hashes})
+        store = ContentStore()
+        documents = []
+        for file_hash, file_path, file_type in cursor.fetchall():
+            # Attachments streamed out of emails ("<eml path>#<name>") live in the content store
+            source = store.path_for(file_hash) if '#' in file_path else base_dir / file_path
+            if source.is_file():
+                documents.append((file_hash, source, file_type))
+        if not documents:
+            return True
         
-        # Update email search vectors
-        cursor.execute("""
-            UPDATE evidence.emails 
-            SET search_vector = to_tsvector('english',
-                COALESCE(subject, '') || ' ' || 
-                COALESCE(body_text, '') || ' ' || 
-                COALESCE(sender, '') || ' ' ||
-                COALESCE(recipient, '')
-            )
-            WHERE search_vector IS NULL
-        """)
+        print(f"📄 Extracting text from {len(documents)} attachment(s)...")
+        
+        def save(file_hash, text, result):
+            nonlocal updated
+            # Triggers re-index the row because content changed; a document with
+            # no text at all stays NULL so it is picked up again
+            cursor.execute("UPDATE evidence.documents SET content = NULLIF(%s, '') WHERE file_hash = %s",
+                           (text, file_hash))
+            cursor.execute("""
+                INSERT INTO evidence.text_extractions (file_hash, file_type, parts, failed_parts, confidence)
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (file_hash) DO UPDATE SET
+                    parts = EXCLUDED.parts, failed_parts = EXCLUDED.failed_parts,
+                    confidence = EXCLUDED.confidence, extracted_at = NOW()
+            """, (file_hash, result['file_type'], result['parts'], len(result['errors']),
+                  result.get('confidence')))
+            updated += 1
+            if updated % 50 == 0:
+                conn.commit()
         
+        extract_texts(documents, save, workers=workers, stats=stats)
         conn.commit()
-        print("✅ Search indexes updated successfully")
+        print(f"✅ Extracted text: {stats}")
         
     except Exception as e:
-        print(f"❌ Error updating search indexes: {e}")
+        print(f"❌ Error extracting attachment text: {e}")
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+        conn.close()
+    
+    return True
+
+def index_email_threads(base_dir=BASE_DIR):
+    """Add thread index rows for emails loaded before threading existed (headers only)"""
+    conn = connect_db()
+    if not conn:
+        return False
+    
+    cursor = conn.cursor()
+    base_dir = Path(base_dir)
+    indexed = 0
+    
+    try:
+        cursor.execute("""
+            SELECT e.file_hash, e.file_path FROM evidence.emails e
+            WHERE e.file_hash IS NOT NULL
+              AND NOT EXISTS (SELECT 1 FROM evidence.email_messages m WHERE m.email_hash = e.file_hash)
+            ORDER BY e.email_date NULLS LAST, e.id
+        """)
+        for file_hash, file_path in cursor.fetchall():
+            eml_file = base_dir / file_path
+            if not eml_file.is_file():
+                continue
+            insert_record(cursor, 'evidence.email_messages', thread_record(file_hash, read_headers(eml_file)))
+            indexed += 1
+        conn.commit()
+        if indexed:
+            print(f"🧵 Indexed threads for {indexed} previously loaded email(s)")
+    except Exception as e:
+        print(f"❌ Error indexing email threads: {e}")
+        conn.rollback()
+        return False
+    finally:
+        cursor.close()
+        conn.close()
+    
+    return True
+
+def cluster_near_duplicates(workers=None):
+    """Sign new or changed evidence text and update near-duplicate clusters"""
+    conn = connect_db()
+    if not conn:
+        return False
+    
+    try:
+        index_near_duplicates(conn, workers=workers)
+    except Exception as e:
+        print(f"❌ Error clustering near-duplicates: {e}")
         conn.rollback()
         return False
     finally:
+        conn.close()
+    
+    return True
+
+def ensure_loader_schema():
+    """Install the weighted search_vector triggers, the thread index and the loader's link tables"""
+    conn = connect_db()
+    if not conn:
+        return False
+    
+    try:
+        install_search_triggers(conn)
+        install_thread_index(conn)
+        install_near_duplicates(conn)
+        cursor = conn.cursor()
+        cursor.execute(LOADER_TABLES_SQL)
         cursor.close()
+        conn.commit()
+        print("✅ Search vector triggers, thread index and loader tables in place")
+    except Exception as e:
+        print(f"❌ Error preparing loader schema: {e}")
+        conn.rollback()
+        return False
+    finally:
         conn.close()
     
     return True
@@ -369,17 +946,49 @@ def verify_data_loading():
         conn.close()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load VCAT evidence files into the database")
+    parser.add_argument('--batch-size', type=int, default=None,
+                        help="Rows per multi-row INSERT (default: LOAD_BATCH_SIZE or 500)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Parser processes (default: PARSE_WORKERS or CPU count; 1 = serial)")
+    parser.add_argument('--skip-extract', action='store_true',
+                        help="Don't extract attachment text (PDF, DOCX, OCR) into content")
+    parser.add_argument('--source-root', type=Path, default=BASE_DIR,
+                        help="Folder holding the evidence folders (default: EVIDENCE_ROOT or this repository)")
+    parser.add_argument('--checkpoint-every', type=int, default=None,
+                        help="Files per committed checkpoint (default: LOAD_CHECKPOINT_FILES or 200)")
+    parser.add_argument('--restart', action='store_true',
+                        help="Abandon an interrupted run instead of resuming it")
+    args = parser.parse_args()
+    
     print("🏛️ VCAT Evidence Data Loader")
     print("=" * 50)
     
+    # Search vectors are computed by triggers at insert time
+    # (existing rows: python3 search_vectors.py)
+    if not ensure_loader_schema():
+        print("❌ Search index setup failed")
+        sys.exit(1)
+    
     # Load evidence files
-    if not load_evidence_files():
+    if not load_evidence_files(args.source_root, batch_size=args.batch_size, workers=args.workers,
+                               checkpoint_every=args.checkpoint_every, restart=args.restart):
         print("❌ Data loading failed")
         sys.exit(1)
     
-    # Update search indexes
-    if not update_search_index():
-        print("❌ Search index update failed")
+    # Thread index rows for emails loaded by earlier versions
+    if not index_email_threads(args.source_root):
+        print("❌ Email thread indexing failed")
+        sys.exit(1)
+    
+    # Extract attachment text into content
+    if not args.skip_extract and not extract_document_text(base_dir=args.source_root, workers=args.workers):
+        print("❌ Attachment text extraction failed")
+        sys.exit(1)
+    
+    # Near-duplicate clusters (after extraction, so attachment text is compared too)
+    if not cluster_near_duplicates(workers=args.workers):
+        print("❌ Near-duplicate clustering failed")
         sys.exit(1)
     
     # Verify loading
@@ -6,17 +6,26 @@ Deploy-ready for Render.com and localhost
 """
 
 from fastapi import FastAPI, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import psycopg2
 import os
+import asyncio
 from datetime import datetime
 import json
 import logging
 
+# Database settings (DB_* env, mygpt-vcat-db credentials by default) live in db_pool
+from db_pool import pooled_connection
+
+try:
+    import orjson
+except ImportError:  # orjson is optional - fall back to the stdlib encoder
+    orjson = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -39,22 +48,8 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Database configuration - Using mygpt-vcat-db container credentials
-DB_CONFIG = {
-    'host': os.getenv('DB_HOST', 'localhost'), 
-    'database': os.getenv('DB_NAME', 'vcat'),
-    'user': os.getenv('DB_USER', 'vcat'),
-    'password': os.getenv('DB_PASSWORD', 'secret123'),
-    'port': int(os.getenv('DB_PORT', 5432))
-}
-
-def get_db_connection():
-    """Get database connection with error handling"""
-    try:
-        return psycopg2.connect(**DB_CONFIG)
-    except Exception as e:
-        logger.error(f"Database connection failed: {e}")
-        raise HTTPException(status_code=500, detail="Database connection failed")
+# Debug mode re-validates fast-path responses against their Pydantic models
+DEBUG = os.getenv('DEBUG', 'false').lower() == 'true'
 
 # Pydantic models
 class SearchResult(BaseModel):
@@ -62,12 +57,29 @@ class SearchResult(BaseModel):
     filename: str
     preview: str
     score: float
+    duplicates: Optional[int] = None
 
 class SearchResponse(BaseModel):
     query: str
     results: List[SearchResult]
     count: int
 
+class ThreadMessage(BaseModel):
+    id: int
+    filename: str
+    subject: Optional[str]
+    sender: Optional[str]
+    recipient: Optional[str]
+    email_date: Optional[str]
+    message_id: Optional[str]
+    in_reply_to: Optional[str]
+    preview: str
+
+class EmailThread(BaseModel):
+    thread_id: str
+    messages: List[ThreadMessage]
+    count: int
+
 class HealthCheck(BaseModel):
     status: str
     database: str
@@ -81,6 +93,133 @@ class ExportResponse(BaseModel):
     document_count: int
     generated_at: str
 
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (C-accelerated) when it is installed"""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+def build_search_payload(query: str, rows: List[tuple], duplicates: Optional[List[int]] = None) -> Dict[str, Any]:
+    """Serialize search.text_search rows straight into the SearchResponse shape"""
+    results = [
+        {
+            'id': row[0],
+            'filename': row[1],
+            'preview': row[2][:200] + "..." if len(row[2]) > 200 else row[2],
+            'score': float(row[3])
+        }
+        for row in rows
+    ]
+    if duplicates is not None:
+        for result, hidden in zip(results, duplicates):
+            result['duplicates'] = hidden
+    payload = {'query': query, 'results': results, 'count': len(results)}
+    
+    # Model validation is only paid for in debug mode
+    if DEBUG:
+        SearchResponse.model_validate(payload)
+    
+    return payload
+
+# search.text_search reports emails as id + 1000, so an id alone can't tell a
+# document from an email; results are matched back on table, id and filename
+SEARCH_EMAIL_ID_OFFSET = 1000
+# Collapsed searches fetch this many candidates per requested result
+COLLAPSE_OVERFETCH = 3
+
+def near_duplicate_clusters(cursor, results: List[tuple]) -> Dict[int, str]:
+    """
+    Near-duplicate cluster per search result id for [(id, filename)] rows of
+    search.text_search (see near_duplicates.py); {} if not indexed
+    """
+    try:
+        cursor.execute("""
+            SELECT r.id, n.cluster_id
+            FROM unnest(%(ids)s::int[], %(filenames)s::text[]) AS r(id, filename)
+            CROSS JOIN LATERAL (
+                SELECT 'document' AS item_type, d.id AS item_id FROM evidence.documents d
+                WHERE d.id = r.id AND d.filename = r.filename
+                UNION ALL
+                SELECT 'email', e.id FROM evidence.emails e
+                WHERE e.id = r.id - %(offset)s AND e.filename = r.filename
+            ) i
+            JOIN evidence.near_duplicates n USING (item_type, item_id)
+        """, {'ids': [result[0] for result in results], 'filenames': [result[1] for result in results],
+              'offset': SEARCH_EMAIL_ID_OFFSET})
+        return dict(cursor.fetchall())
+    except psycopg2.Error as e:
+        logger.warning(f"Near-duplicate clusters unavailable: {e}")
+        cursor.connection.rollback()
+        return {}
+
+def collapse_near_duplicates(items: List[Any], ids: List[int], clusters: Dict[int, str], limit: int):
+    """
+    Keep the first (best-scoring) item of each cluster, up to `limit`.
+    Returns (kept items, number of near-duplicates hidden behind each).
+    """
+    kept, hidden, positions = [], [], {}
+    for item, item_id in zip(items, ids):
+        # Items without a signature are their own cluster
+        cluster = clusters.get(item_id, item_id)
+        if cluster in positions:
+            hidden[positions[cluster]] += 1
+        elif len(kept) < limit:
+            positions[cluster] = len(kept)
+            kept.append(item)
+            hidden.append(0)
+    return kept, hidden
+
+# Readiness flag flipped once warm-up has finished
+app.state.ready = False
+
+WARMUP_ATTEMPTS = int(os.getenv('WARMUP_ATTEMPTS', 5))
+WARMUP_RETRY_DELAY = float(os.getenv('WARMUP_RETRY_DELAY', 1.0))
+
+def check_database():
+    """One round trip through the pool the request handlers use (blocking)"""
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM evidence.documents")
+        cursor.fetchone()
+        cursor.close()
+
+@app.on_event("startup")
+async def warm_up():
+    """Warm the connection pool before taking traffic; signal readiness only once it works"""
+    delay = WARMUP_RETRY_DELAY
+    for attempt in range(1, WARMUP_ATTEMPTS + 1):
+        try:
+            # Off the event loop: connecting and querying block
+            await asyncio.to_thread(check_database)
+            break
+        except Exception as e:
+            logger.warning(f"Warm-up attempt {attempt}/{WARMUP_ATTEMPTS} failed: {e}")
+            if attempt < WARMUP_ATTEMPTS:
+                await asyncio.sleep(delay)
+                delay *= 2
+    else:
+        # Keep serving, but /ready stays 503 so server_supervisor won't switch to this worker
+        logger.error("Warm-up failed, worker not ready")
+        return
+    
+    logger.info("Connection pool warmed up")
+    app.state.ready = True
+    
+    # Tell server_supervisor this worker can take over from the old ones
+    ready_dir = os.getenv('VCAT_READY_DIR')
+    if ready_dir:
+        with open(os.path.join(ready_dir, str(os.getpid())), 'w') as f:
+            f.write(datetime.now().isoformat())
+
+@app.get("/ready", tags=["System"])
+async def readiness():
+    """Readiness probe: 200 once warm-up has completed"""
+    if not app.state.ready:
+        raise HTTPException(status_code=503, detail="Warming up")
+    return {"status": "ready", "pid": os.getpid()}
+
 # Serve static files (Web UI)
 try:
     app.mount("/static", StaticFiles(directory="static"), name="static")
@@ -173,12 +312,11 @@ async def serve_web_ui():
 async def health_check():
     """System health check with database connectivity"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM evidence.documents")
-        count = cursor.fetchone()[0]
-        cursor.close()
-        conn.close()
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM evidence.documents")
+            count = cursor.fetchone()[0]
+            cursor.close()
         
         return HealthCheck(
             status="operational",
@@ -193,7 +331,8 @@ async def health_check():
 @app.get("/search", response_model=SearchResponse, tags=["Search"])
 async def search_documents(
     q: str = Query(..., description="Search query string"),
-    limit: int = Query(10, ge=1, le=50, description="Maximum number of results")
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
+    collapse: bool = Query(False, description="Keep one result per near-duplicate cluster")
 ):
     """
     Search through 634+ legal documents with full-text search
@@ -202,57 +341,106 @@ async def search_documents(
     - `/search?q=water+damage&limit=5` - Water damage incidents
     - `/search?q=RT252398` - VCAT case number
     - `/search?q=notice+to+vacate` - Legal notices
+    - `/search?q=water+damage&collapse=true` - One result per near-duplicate cluster
     """
     if not q.strip():
         raise HTTPException(status_code=400, detail="Query parameter 'q' cannot be empty")
     
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM search.text_search(%s, %s)", (q, limit))
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM search.text_search(%s, %s)",
+                           (q, limit * COLLAPSE_OVERFETCH if collapse else limit))
+            rows = cursor.fetchall()
+            duplicates = None
+            if collapse:
+                ids = [row[0] for row in rows]
+                rows, duplicates = collapse_near_duplicates(rows, ids, near_duplicate_clusters(cursor, rows), limit)
         
-        results = []
-        for row in cursor.fetchall():
-            results.append(SearchResult(
-                id=row[0],
-                filename=row[1],
-                preview=row[2][:200] + "..." if len(row[2]) > 200 else row[2],
-                score=float(row[3])
-            ))
+            cursor.close()
         
-        cursor.close()
-        conn.close()
-        
-        return SearchResponse(
-            query=q,
-            results=results,
-            count=len(results)
-        )
+        # Returning a Response directly skips FastAPI's response_model re-validation
+        return FastJSONResponse(content=build_search_payload(q, rows, duplicates))
     except Exception as e:
         logger.error(f"Search failed: {e}")
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
+@app.get("/emails/{email_id}/thread", response_model=EmailThread, tags=["Search"])
+async def email_thread(email_id: int):
+    """
+    Whole conversation an email belongs to, oldest first
+    (threads follow Message-ID / In-Reply-To / References, see email_threads.py)
+    """
+    try:
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT m.thread_id, e.id, e.filename, e.subject, e.sender, e.recipient, e.email_date,
+                       m.message_id, m.in_reply_to, LEFT(COALESCE(e.body_text, ''), 201)
+                FROM evidence.email_messages m
+                JOIN evidence.emails e ON e.file_hash = m.email_hash
+                WHERE m.thread_id = (
+                    SELECT t.thread_id FROM evidence.email_messages t
+                    JOIN evidence.emails s ON s.file_hash = t.email_hash
+                    WHERE s.id = %s
+                )
+                ORDER BY e.email_date NULLS LAST, e.id
+            """, (email_id,))
+            rows = cursor.fetchall()
+        
+            cursor.close()
+    except Exception as e:
+        logger.error(f"Thread lookup failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Thread lookup failed: {str(e)}")
+    
+    if not rows:
+        raise HTTPException(status_code=404, detail=f"No thread indexed for email {email_id}")
+    
+    messages = [
+        {
+            'id': row[1],
+            'filename': row[2],
+            'subject': row[3],
+            'sender': row[4],
+            'recipient': row[5],
+            'email_date': row[6].isoformat() if row[6] else None,
+            'message_id': row[7],
+            'in_reply_to': row[8],
+            'preview': row[9][:200] + "..." if len(row[9]) > 200 else row[9]
+        }
+        for row in rows
+    ]
+    payload = {'thread_id': rows[0][0], 'messages': messages, 'count': len(messages)}
+    
+    if DEBUG:
+        EmailThread.model_validate(payload)
+    
+    return FastJSONResponse(content=payload)
+
 @app.get("/export/search", response_class=HTMLResponse, tags=["Export"])
 async def export_search_results(
-    q: str = Query(..., description="Search query for evidence selection")
+    q: str = Query(..., description="Search query for evidence selection"),
+    collapse: bool = Query(False, description="One exhibit per near-duplicate cluster")
 ):
     """Generate court-ready evidence bundle from search results"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT * FROM search.text_search(%s, 25)", (q,))
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM search.text_search(%s, %s)", (q, 25 * COLLAPSE_OVERFETCH if collapse else 25))
+        
+            results = []
+            for row in cursor.fetchall():
+                results.append({
+                    'id': row[0],
+                    'filename': row[1],
+                    'content': row[2],
+                    'score': float(row[3])
+                })
         
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                'id': row[0],
-                'filename': row[1],
-                'content': row[2],
-                'score': float(row[3])
-            })
+            if collapse:
+                results = collapse_bundle_results(cursor, results)
         
-        cursor.close()
-        conn.close()
+            cursor.close()
         
         # Generate HTML bundle
         html_content = generate_evidence_bundle_html(q, results)
@@ -271,14 +459,13 @@ async def export_search_results(
 async def export_case_summary():
     """Generate comprehensive case overview document"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT COUNT(*) FROM evidence.documents")
-        doc_count = cursor.fetchone()[0]
-        cursor.execute("SELECT COUNT(*) FROM evidence.emails")
-        email_count = cursor.fetchone()[0]
-        cursor.close()
-        conn.close()
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM evidence.documents")
+            doc_count = cursor.fetchone()[0]
+            cursor.execute("SELECT COUNT(*) FROM evidence.emails")
+            email_count = cursor.fetchone()[0]
+            cursor.close()
         
         html_content = f"""
         <!DOCTYPE html>
@@ -380,8 +567,19 @@ async def export_case_summary():
         logger.error(f"Case summary export failed: {e}")
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
 
+def collapse_bundle_results(cursor, results: List[Dict[str, Any]], limit: int = 25) -> List[Dict[str, Any]]:
+    """One exhibit per near-duplicate cluster, noting how many copies it stands for"""
+    ids = [result['id'] for result in results]
+    clusters = near_duplicate_clusters(cursor, [(result['id'], result['filename']) for result in results])
+    kept, hidden = collapse_near_duplicates(results, ids, clusters, limit)
+    for result, duplicates in zip(kept, hidden):
+        result['duplicates'] = duplicates
+    return kept
+
 @app.get("/export/legal-bundle", response_class=HTMLResponse, tags=["Export"])
-async def export_legal_bundle():
+async def export_legal_bundle(
+    collapse: bool = Query(False, description="One exhibit per near-duplicate cluster")
+):
     """Generate complete court-ready evidence package"""
     try:
         # Get top evidence from multiple categories
@@ -394,32 +592,35 @@ async def export_legal_bundle():
         ]
         
         all_results = []
-        conn = get_db_connection()
-        cursor = conn.cursor()
+        with pooled_connection() as conn:
+            cursor = conn.cursor()
         
-        for query in queries:
-            cursor.execute("SELECT * FROM search.text_search(%s, 5)", (query,))
-            for row in cursor.fetchall():
-                all_results.append({
-                    'id': row[0],
-                    'filename': row[1],
-                    'content': row[2],
-                    'score': float(row[3]),
-                    'category': query
-                })
+            for query in queries:
+                cursor.execute("SELECT * FROM search.text_search(%s, %s)",
+                               (query, 5 * COLLAPSE_OVERFETCH if collapse else 5))
+                for row in cursor.fetchall():
+                    all_results.append({
+                        'id': row[0],
+                        'filename': row[1],
+                        'content': row[2],
+                        'score': float(row[3]),
+                        'category': query
+                    })
         
-        cursor.close()
-        conn.close()
+            # Remove duplicates and sort by score
+            seen_ids = set()
+            unique_results = []
+            for result in sorted(all_results, key=lambda x: x['score'], reverse=True):
+                if result['id'] not in seen_ids:
+                    unique_results.append(result)
+                    seen_ids.add(result['id'])
+                    if len(unique_results) >= 25 and not collapse:  # Limit to top 25
+                        break
+        
+            if collapse:
+                unique_results = collapse_bundle_results(cursor, unique_results)
         
-        # Remove duplicates and sort by score
-        seen_ids = set()
-        unique_results = []
-        for result in sorted(all_results, key=lambda x: x['score'], reverse=True):
-            if result['id'] not in seen_ids:
-                unique_results.append(result)
-                seen_ids.add(result['id'])
-                if len(unique_results) >= 25:  # Limit to top 25
-                    break
+            cursor.close()
         
         html_content = generate_evidence_bundle_html("Complete Legal Bundle", unique_results)
         
@@ -526,6 +727,7 @@ def generate_evidence_bundle_html(query: str, results: List[Dict[str, Any]]) ->
                 <span class="relevance">Relevance: {relevance_percent}</span>
             </div>
             <h3>Document: {result['filename']}</h3>
+            {f"<p><em>Near-duplicate copies collapsed into this exhibit: {result['duplicates']}</em></p>" if result.get('duplicates') else ''}
             <div class="content">{result['content'][:2000]}{'...' if len(result['content']) > 2000 else ''}</div>
         </div>
         """
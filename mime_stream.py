@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Streaming MIME Parser for VCAT Evidence Repository
+Reads .eml files line by line: header blocks go through the stdlib feed parser,
+text bodies are kept, and attachment payloads are decoded straight into a
+content-addressed store while being hashed, so memory does not grow with attachment size
+"""
+
+import os
+import re
+import hashlib
+import binascii
+import tempfile
+import mimetypes
+from pathlib import Path
+from email.parser import BytesFeedParser
+
+# Relative to this directory, not the cwd, so the loader, its pool workers and the
+# extractor all resolve the same store wherever they are started from
+ATTACHMENT_STORE = Path(__file__).resolve().parent / os.getenv('ATTACHMENT_STORE', '.attachment_store')
+
+class ContentStore:
+    """Blobs stored once under <root>/<sha[:2]>/<sha256>"""
+
+    def __init__(self, root=None):
+        self.root = Path(root or ATTACHMENT_STORE)
+
+    def path_for(self, digest):
+        return self.root / digest[:2] / digest
+
+    def writer(self):
+        return BlobWriter(self)
+
+    def remove(self, digest):
+        """Delete a blob once nothing references it (missing blobs are ignored)"""
+        try:
+            os.unlink(self.path_for(digest))
+        except FileNotFoundError:
+            pass
+
+class BlobWriter:
+    """Hashes and spools bytes to a temp file, then moves it to its content address"""
+
+    def __init__(self, store):
+        self.store = store
+        store.root.mkdir(parents=True, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(dir=store.root, prefix='.incoming-')
+        self.file = os.fdopen(fd, 'wb')
+        self.hasher = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        if data:
+            self.hasher.update(data)
+            self.file.write(data)
+            self.size += len(data)
+
+    def commit(self):
+        """Returns (sha256, size, stored path)"""
+        self.file.close()
+        digest = self.hasher.hexdigest()
+        path = self.store.path_for(digest)
+        if path.exists():
+            os.unlink(self.tmp_path)
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self.tmp_path, path)
+        return digest, self.size, path
+
+    def discard(self):
+        self.file.close()
+        os.unlink(self.tmp_path)
+
+class TextBuffer:
+    """Small in-memory sink for body text parts"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(data)
+
+    def getvalue(self):
+        return b''.join(self.chunks)
+
+class _Base64Decoder:
+    def __init__(self, sink):
+        self.sink = sink
+        self.pending = b''
+
+    def feed(self, line):
+        data = self.pending + re.sub(rb'[^A-Za-z0-9+/=]', b'', line)
+        usable = len(data) - len(data) % 4
+        self.pending = data[usable:]
+        if usable:
+            try:
+                self.sink.write(binascii.a2b_base64(data[:usable]))
+            except binascii.Error:
+                pass
+
+    def close(self):
+        if self.pending:
+            try:
+                self.sink.write(binascii.a2b_base64(self.pending + b'=' * (-len(self.pending) % 4)))
+            except binascii.Error:
+                pass
+
+class _QuotedPrintableDecoder:
+    def __init__(self, sink):
+        self.sink = sink
+
+    def feed(self, line):
+        self.sink.write(binascii.a2b_qp(line))
+
+    def close(self):
+        pass
+
+class _RawDecoder:
+    def __init__(self, sink):
+        self.sink = sink
+
+    def feed(self, line):
+        self.sink.write(line)
+
+    def close(self):
+        pass
+
+DECODERS = {
+    'base64': _Base64Decoder,
+    'quoted-printable': _QuotedPrintableDecoder
+}
+
+# Longest slice read at once; bounds memory even for payloads without line breaks
+LINE_LIMIT = 1024 * 1024
+
+class _LineReader:
+    def __init__(self, f):
+        self.f = f
+
+    def readline(self):
+        return self.f.readline(LINE_LIMIT)
+
+def _read_headers(reader):
+    """Feed one header block (up to the blank line) to the stdlib parser"""
+    parser = BytesFeedParser()
+    while True:
+        line = reader.readline()
+        if not line:
+            break
+        parser.feed(line)
+        if line in (b'\r\n', b'\n'):
+            break
+    return parser.close()
+
+def _boundary_of(line, boundaries):
+    """(boundary, is_close) if the line is a delimiter for any open multipart"""
+    if not line.startswith(b'--'):
+        return None
+    stripped = line.rstrip(b' \t\r\n')
+    for boundary in boundaries:
+        if stripped == b'--' + boundary:
+            return boundary, False
+        if stripped == b'--' + boundary + b'--':
+            return boundary, True
+    return None
+
+def _attachment_filename(part):
+    filename = part.get_filename()
+    if filename:
+        # Strip any directory components a sender put in the name
+        return Path(filename.replace('\\', '/')).name or None
+    return None
+
+def _is_attachment(part):
+    disposition = (part.get('Content-Disposition') or '').split(';')[0].strip().lower()
+    if disposition == 'attachment' or _attachment_filename(part):
+        return True
+    return part.get_content_maintype() not in ('text', 'multipart')
+
+class StreamingEmail:
+    """Parse result: headers, text/plain and text/html bodies, stored attachments"""
+
+    def __init__(self):
+        self.headers = None
+        self.plain = []
+        self.html = []
+        self.attachments = []
+
+def _decode_text(data, part):
+    charset = part.get_content_charset() or 'utf-8'
+    try:
+        return data.decode(charset, errors='ignore')
+    except LookupError:
+        return data.decode('utf-8', errors='ignore')
+
+def _read_leaf(reader, part, boundaries, result, store):
+    """Stream one non-multipart body; returns the delimiter line that ended it (or b'' at EOF)"""
+    attachment = _is_attachment(part)
+    sink = store.writer() if attachment else TextBuffer()
+    encoding = (part.get('Content-Transfer-Encoding') or '').strip().lower()
+    decoder = DECODERS.get(encoding, _RawDecoder)(sink)
+
+    # The line break before a delimiter belongs to the delimiter, so stay one line behind
+    held = None
+    while True:
+        line = reader.readline()
+        if not line or _boundary_of(line, boundaries):
+            break
+        if held is not None:
+            decoder.feed(held)
+        held = line
+    if held is not None:
+        decoder.feed(held.rstrip(b'\r\n') if line else held)
+    decoder.close()
+
+    if attachment:
+        if sink.size == 0:
+            sink.discard()
+        else:
+            digest, size, path = sink.commit()
+            content_type = part.get_content_type()
+            filename = _attachment_filename(part) or f"attachment{mimetypes.guess_extension(content_type) or '.bin'}"
+            result.attachments.append({
+                'filename': filename,
+                'content_type': content_type,
+                'file_hash': digest,
+                'size': size,
+                'path': str(path)
+            })
+    elif part.get_content_type() == 'text/html':
+        result.html.append(_decode_text(sink.getvalue(), part))
+    else:
+        result.plain.append(_decode_text(sink.getvalue(), part))
+    return line
+
+def _read_part(reader, part, boundaries, result, store):
+    boundary = part.get_boundary() if part.get_content_maintype() == 'multipart' else None
+    if not boundary:
+        return _read_leaf(reader, part, boundaries, result, store)
+
+    boundary = boundary.encode('ascii', errors='ignore')
+    inner = [boundary] + boundaries
+
+    # Preamble
+    while True:
+        line = reader.readline()
+        if not line:
+            return b''
+        found = _boundary_of(line, inner)
+        if found:
+            break
+
+    while found and found[0] == boundary and not found[1]:
+        child = _read_headers(reader)
+        line = _read_part(reader, child, inner, result, store)
+        found = _boundary_of(line, inner) if line else None
+
+    if found and found[0] != boundary:
+        # An outer delimiter closed this multipart early
+        return line
+
+    # Epilogue: skip until an outer delimiter or EOF
+    while True:
+        line = reader.readline()
+        if not line or _boundary_of(line, boundaries):
+            return line
+
+def read_headers(file_path):
+    """Top-level header block only; the body is never read"""
+    with open(file_path, 'rb') as f:
+        return _read_headers(_LineReader(f))
+
+def parse_email_stream(file_path, store=None):
+    """Parse an .eml without loading it whole; attachments land in the content store"""
+    store = store or ContentStore()
+    result = StreamingEmail()
+    with open(file_path, 'rb') as f:
+        reader = _LineReader(f)
+        result.headers = _read_headers(reader)
+        _read_part(reader, result.headers, [], result, store)
+    return result
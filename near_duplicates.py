@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Detection for VCAT Evidence Repository
+MinHash signatures over word shingles, banded LSH buckets for candidate lookup and
+near-duplicate clusters (evidence.near_duplicates) used to collapse search results
+"""
+
+import os
+import re
+import sys
+import time
+import random
+import struct
+import hashlib
+import argparse
+
+from ingest_pipeline import ParsePipeline, PipelineStats
+
+NUM_PERM = 128
+LSH_BANDS = 16
+ROWS_PER_BAND = NUM_PERM // LSH_BANDS
+SHINGLE_SIZE = int(os.getenv('NEAR_DUP_SHINGLE', 5))
+# Estimated Jaccard similarity at which two items count as near-duplicates
+NEAR_DUP_THRESHOLD = float(os.getenv('NEAR_DUP_THRESHOLD', 0.8))
+
+MERSENNE_61 = (1 << 61) - 1
+# Fixed seed: signatures must stay comparable across runs and processes
+_rng = random.Random(1803)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_61), _rng.randrange(MERSENNE_61)) for _ in range(NUM_PERM)]
+
+WORD_PATTERN = re.compile(r'\w+')
+# Links, cid: references and bracketed addresses differ between the plain-text and HTML
+# renderings of the same message and carry no content
+NOISE_PATTERN = re.compile(r'(?:https?://|www\.|cid:|mailto:)\S*|<[^<>\s]*>|\[[^\]\s]*\]', re.IGNORECASE)
+
+INSTALL_SQL = """
+CREATE TABLE IF NOT EXISTS evidence.near_duplicates (
+    item_type text NOT NULL,
+    item_id integer NOT NULL,
+    text_md5 text NOT NULL,
+    signature bigint[] NOT NULL,
+    cluster_id text NOT NULL,
+    PRIMARY KEY (item_type, item_id)
+);
+CREATE INDEX IF NOT EXISTS near_duplicates_cluster_idx ON evidence.near_duplicates (cluster_id);
+
+CREATE TABLE IF NOT EXISTS evidence.near_duplicate_bands (
+    band smallint NOT NULL,
+    bucket bigint NOT NULL,
+    item_type text NOT NULL,
+    item_id integer NOT NULL,
+    FOREIGN KEY (item_type, item_id) REFERENCES evidence.near_duplicates ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS near_duplicate_bands_bucket_idx ON evidence.near_duplicate_bands (band, bucket);
+CREATE INDEX IF NOT EXISTS near_duplicate_bands_item_idx ON evidence.near_duplicate_bands (item_type, item_id);
+"""
+
+# Text each item is compared on; emails are laid out like the header block of the
+# Gmail HTML export so an .eml and its .html copy sign alike
+ITEMS_SQL = """
+    SELECT 'document' AS item_type, id AS item_id, COALESCE(content, '') AS text FROM evidence.documents
+    UNION ALL
+    SELECT 'email', id, concat_ws(' ', subject, 'Subject:', subject, 'From:', sender, 'Date: To:', recipient, body_text)
+    FROM evidence.emails
+"""
+
+def shingles(text):
+    """Word n-grams of normalized text (the whole word list for very short texts)"""
+    words = WORD_PATTERN.findall(NOISE_PATTERN.sub(' ', text).lower())
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+
+def minhash(text):
+    """NUM_PERM-value MinHash signature, or None for text without words"""
+    hashes = [_hash64(shingle) for shingle in shingles(text)]
+    if not hashes:
+        return None
+    return [min((a * h + b) % MERSENNE_61 for h in hashes) for a, b in PERMUTATIONS]
+
+def similarity(first, second):
+    """Estimated Jaccard similarity of two signatures"""
+    return sum(x == y for x, y in zip(first, second)) / NUM_PERM
+
+def lsh_buckets(signature):
+    """(band, bucket) per band; items sharing any bucket are candidate near-duplicates"""
+    buckets = []
+    for band in range(LSH_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f'>{ROWS_PER_BAND}Q', *rows), digest_size=8).digest()
+        buckets.append((band, struct.unpack('>q', digest)[0]))
+    return buckets
+
+def item_signature(label, text, *_):
+    """Pipeline worker: signature for one item"""
+    return minhash(text)
+
+def install_near_duplicates(conn):
+    """Create the signature, LSH band and cluster tables (idempotent)"""
+    with conn.cursor() as cursor:
+        cursor.execute(INSTALL_SQL)
+    conn.commit()
+
+def add_item(cursor, item_type, item_id, text_md5, signature, threshold=None):
+    """
+    Store one item's signature and LSH buckets and place it in a cluster.
+    An item matching several clusters merges them; cluster ids are the smallest
+    member key, so the label does not depend on load order. Returns the cluster id.
+    """
+    threshold = NEAR_DUP_THRESHOLD if threshold is None else threshold
+    key = f"{item_type}:{item_id}"
+    buckets = lsh_buckets(signature)
+
+    cursor.execute("DELETE FROM evidence.near_duplicates WHERE item_type = %s AND item_id = %s",
+                   (item_type, item_id))
+    cursor.execute("""
+        SELECT DISTINCT n.item_type, n.item_id, n.signature, n.cluster_id
+        FROM evidence.near_duplicate_bands b
+        JOIN evidence.near_duplicates n USING (item_type, item_id)
+        WHERE (b.band, b.bucket) IN (SELECT * FROM unnest(%s::smallint[], %s::bigint[]))
+    """, ([band for band, _ in buckets], [bucket for _, bucket in buckets]))
+    related = {cluster for _, _, candidate, cluster in cursor.fetchall()
+               if similarity(signature, candidate) >= threshold}
+
+    cluster_id = min(related | {key})
+    if related - {cluster_id}:
+        cursor.execute("UPDATE evidence.near_duplicates SET cluster_id = %s WHERE cluster_id = ANY(%s)",
+                       (cluster_id, list(related - {cluster_id})))
+    cursor.execute("""
+        INSERT INTO evidence.near_duplicates (item_type, item_id, text_md5, signature, cluster_id)
+        VALUES (%s, %s, %s, %s, %s)
+    """, (item_type, item_id, text_md5, signature, cluster_id))
+    cursor.executemany("""
+        INSERT INTO evidence.near_duplicate_bands (band, bucket, item_type, item_id)
+        VALUES (%s, %s, %s, %s)
+    """, [(band, bucket, item_type, item_id) for band, bucket in buckets])
+    return cluster_id
+
+def index_near_duplicates(conn, workers=None, threshold=None, rebuild=False):
+    """
+    Sign every document/email whose text is new or changed since it was last
+    signed (MinHash in worker processes) and cluster it against the LSH index.
+    Returns the number of items signed.
+    """
+    stats = PipelineStats()
+    signed = 0
+    with conn.cursor() as cursor:
+        cursor.execute(INSTALL_SQL)
+        if rebuild:
+            cursor.execute("TRUNCATE evidence.near_duplicate_bands, evidence.near_duplicates")
+        # Rows deleted from the evidence tables leave their signatures behind
+        cursor.execute(f"""
+            DELETE FROM evidence.near_duplicates n
+            WHERE NOT EXISTS (SELECT 1 FROM ({ITEMS_SQL}) i
+                              WHERE i.item_type = n.item_type AND i.item_id = n.item_id)
+        """)
+        cursor.execute(f"""
+            SELECT i.item_type, i.item_id, md5(i.text), i.text
+            FROM ({ITEMS_SQL}) i
+            LEFT JOIN evidence.near_duplicates n USING (item_type, item_id)
+            WHERE i.text ~ '\\w' AND (n.item_id IS NULL OR n.text_md5 <> md5(i.text))
+            ORDER BY i.item_type, i.item_id
+        """)
+        items = [(f"{item_type}:{item_id}", text, item_type, item_id, text_md5)
+                 for item_type, item_id, text_md5, text in cursor.fetchall()]
+        if not items:
+            conn.commit()
+            return 0
+
+        print(f"🧬 Signing {len(items)} item(s) for near-duplicate detection...")
+
+        def store(item, signature):
+            nonlocal signed
+            if signature is None:
+                return
+            _, _, item_type, item_id, text_md5 = item
+            add_item(cursor, item_type, item_id, text_md5, signature, threshold)
+            signed += 1
+            if signed % 200 == 0:
+                conn.commit()
+
+        ParsePipeline(item_signature, workers=workers).run(iter(items), store, stats)
+        conn.commit()
+
+        cursor.execute("""
+            SELECT COUNT(*), COALESCE(SUM(size - 1), 0) FROM (
+                SELECT COUNT(*) AS size FROM evidence.near_duplicates GROUP BY cluster_id HAVING COUNT(*) > 1
+            ) clusters
+        """)
+        clusters, duplicates = cursor.fetchone()
+    print(f"✅ Near-duplicates: {signed} signed ({stats}); {clusters} clusters, {duplicates} collapsible items")
+    return signed
+
+def main():
+    parser = argparse.ArgumentParser(description="Sign evidence text and cluster near-duplicates")
+    parser.add_argument('--workers', type=int, default=None, help="Signing processes (default: PARSE_WORKERS or CPU count)")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="Estimated Jaccard similarity for a near-duplicate (default: NEAR_DUP_THRESHOLD or 0.8)")
+    parser.add_argument('--rebuild', action='store_true', help="Drop all signatures and clusters and start over")
+    args = parser.parse_args()
+
+    from load_evidence_data import connect_db
+    conn = connect_db()
+    if not conn:
+        sys.exit(1)
+    try:
+        start = time.perf_counter()
+        index_near_duplicates(conn, args.workers, args.threshold, args.rebuild)
+        print(f"⏱️ {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Near-duplicate indexing failed: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
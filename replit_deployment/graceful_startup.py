@@ -9,6 +9,7 @@ import sys
 import psycopg2
 import subprocess
 from pathlib import Path
+from parallel_restore import find_backup, restore_backup, RestoreError
 
 def check_database_connection():
     """Check if database is available and accessible"""
@@ -33,9 +34,9 @@ def check_database_connection():
 
 def try_backup_restore():
     """Attempt to restore from backup if available"""
-    backup_file = Path(__file__).parent / 'vcat_database_backup.dump'
+    backup = find_backup(Path(__file__).parent)
     
-    if not backup_file.exists():
+    if not backup:
         print("⚠️ No backup file found")
         return False
     
@@ -45,18 +46,16 @@ def try_backup_restore():
         # Try to create database
         subprocess.run(['createdb', 'vcat'], check=False, capture_output=True)
         
-        # Restore from backup
-        result = subprocess.run([
-            'pg_restore', '--clean', '--no-acl', '--no-owner', 
-            '-d', 'vcat', str(backup_file)
-        ], check=False, capture_output=True)
-        
-        if result.returncode == 0:
-            print("✅ Backup restore successful")
-            return True
-        else:
-            print(f"⚠️ Backup restore failed: {result.stderr.decode()}")
+        # Restore from backup (parallel data load, indexes deferred to the end)
+        try:
+            restore_backup(backup, ['-d', 'vcat'], clean=True,
+                           extra_args=['--no-acl', '--no-owner'])
+        except RestoreError as e:
+            print(f"⚠️ Backup restore failed: {e}")
             return False
+        
+        print("✅ Backup restore successful")
+        return True
             
     except Exception as e:
         print(f"⚠️ Backup restore error: {e}")
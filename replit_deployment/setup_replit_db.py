@@ -8,7 +8,7 @@ import os
 import subprocess
 import psycopg2
 import sys
-from pathlib import Path
+from parallel_restore import find_backup, restore_backup, RestoreError
 
 def setup_postgresql():
     """Initialize PostgreSQL on Replit"""
@@ -68,27 +68,24 @@ def restore_database():
     """Restore database from backup"""
     print("📊 Restoring database from backup...")
     
-    backup_file = Path("vcat_database_backup.dump")
-    if not backup_file.exists():
+    backup = find_backup()
+    if not backup:
         print("❌ Backup file not found")
         return False
     
     try:
-        # Restore using pg_restore
-        subprocess.run([
-            'pg_restore',
-            '-h', 'localhost',
-            '-U', 'vcat',
-            '-d', 'vcat',
-            '--no-owner',
-            '--no-privileges',
-            str(backup_file)
-        ], check=True, env={**os.environ, 'PGPASSWORD': 'secret123'})
+        # Parallel, sectioned pg_restore (indexes built after all data is loaded)
+        restore_backup(
+            backup,
+            ['-h', 'localhost', '-U', 'vcat', '-d', 'vcat'],
+            env={**os.environ, 'PGPASSWORD': 'secret123'},
+            extra_args=['--no-owner', '--no-privileges']
+        )
         
-        print("✅ Database restored successfully")
+        print(f"✅ Database restored successfully from {backup}")
         return True
         
-    except subprocess.CalledProcessError as e:
+    except RestoreError as e:
         print(f"❌ Database restore failed: {e}")
         return False
 
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Write-Time Search Vectors for VCAT Evidence Repository
+Weighted tsvector triggers on evidence.documents / evidence.emails plus a resumable chunked backfill
+"""
+
+import os
+import sys
+import time
+import argparse
+
+# Weights: A = title/subject, B = filename or sender/recipient, C = body text
+INSTALL_SQL = """
+CREATE OR REPLACE FUNCTION evidence.document_search_vector(title text, filename text, content text)
+RETURNS tsvector LANGUAGE sql IMMUTABLE AS $$
+    SELECT setweight(to_tsvector('english', COALESCE(title, '')), 'A') ||
+           setweight(to_tsvector('english', COALESCE(filename, '')), 'B') ||
+           setweight(to_tsvector('english', COALESCE(content, '')), 'C')
+$$;
+
+CREATE OR REPLACE FUNCTION evidence.email_search_vector(subject text, sender text, recipient text, body_text text)
+RETURNS tsvector LANGUAGE sql IMMUTABLE AS $$
+    SELECT setweight(to_tsvector('english', COALESCE(subject, '')), 'A') ||
+           setweight(to_tsvector('english', COALESCE(sender, '') || ' ' || COALESCE(recipient, '')), 'B') ||
+           setweight(to_tsvector('english', COALESCE(body_text, '')), 'C')
+$$;
+
+CREATE OR REPLACE FUNCTION evidence.documents_search_vector_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector := evidence.document_search_vector(NEW.title, NEW.filename, NEW.content);
+    RETURN NEW;
+END
+$$;
+
+CREATE OR REPLACE FUNCTION evidence.emails_search_vector_trigger() RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.search_vector := evidence.email_search_vector(NEW.subject, NEW.sender, NEW.recipient, NEW.body_text);
+    RETURN NEW;
+END
+$$;
+
+DROP TRIGGER IF EXISTS documents_search_vector ON evidence.documents;
+CREATE TRIGGER documents_search_vector
+    BEFORE INSERT OR UPDATE OF title, filename, content ON evidence.documents
+    FOR EACH ROW EXECUTE FUNCTION evidence.documents_search_vector_trigger();
+
+DROP TRIGGER IF EXISTS emails_search_vector ON evidence.emails;
+CREATE TRIGGER emails_search_vector
+    BEFORE INSERT OR UPDATE OF subject, sender, recipient, body_text ON evidence.emails
+    FOR EACH ROW EXECUTE FUNCTION evidence.emails_search_vector_trigger();
+
+CREATE TABLE IF NOT EXISTS evidence.search_vector_backfill (
+    table_name text PRIMARY KEY,
+    last_id bigint NOT NULL DEFAULT 0,
+    rows_done bigint NOT NULL DEFAULT 0,
+    finished_at timestamptz
+);
+"""
+
+# Table -> expression recomputing its vector (the trigger does not fire: only search_vector is SET)
+BACKFILL_EXPRESSIONS = {
+    'evidence.documents': "evidence.document_search_vector(title, filename, content)",
+    'evidence.emails': "evidence.email_search_vector(subject, sender, recipient, body_text)"
+}
+
+def install_search_triggers(conn):
+    """Create the vector functions and triggers (idempotent)"""
+    with conn.cursor() as cursor:
+        cursor.execute(INSTALL_SQL)
+    conn.commit()
+
+def backfill_table(conn, table, chunk_size=1000, pause=0.0, restart=False):
+    """
+    Recompute search_vector for existing rows in id order, one committed chunk
+    at a time. Progress lives in evidence.search_vector_backfill, so an
+    interrupted run resumes after the last committed chunk.
+    """
+    expression = BACKFILL_EXPRESSIONS[table]
+    with conn.cursor() as cursor:
+        if restart:
+            cursor.execute("DELETE FROM evidence.search_vector_backfill WHERE table_name = %s", (table,))
+        cursor.execute("""
+            INSERT INTO evidence.search_vector_backfill (table_name) VALUES (%s)
+            ON CONFLICT (table_name) DO NOTHING
+        """, (table,))
+        cursor.execute("SELECT last_id, rows_done, finished_at FROM evidence.search_vector_backfill "
+                       "WHERE table_name = %s", (table,))
+        last_id, rows_done, finished_at = cursor.fetchone()
+        conn.commit()
+
+        if finished_at:
+            print(f"✅ {table}: already backfilled ({rows_done} rows, finished {finished_at})")
+            return rows_done
+        if last_id:
+            print(f"↪️ {table}: resuming after id {last_id} ({rows_done} rows done)")
+
+        start = time.perf_counter()
+        while True:
+            cursor.execute(f"""
+                UPDATE {table} SET search_vector = {expression}
+                WHERE id IN (SELECT id FROM {table} WHERE id > %s ORDER BY id LIMIT %s)
+                RETURNING id
+            """, (last_id, chunk_size))
+            ids = [row[0] for row in cursor.fetchall()]
+            if not ids:
+                cursor.execute("UPDATE evidence.search_vector_backfill SET finished_at = NOW() "
+                               "WHERE table_name = %s", (table,))
+                conn.commit()
+                break
+
+            last_id = max(ids)
+            rows_done += len(ids)
+            cursor.execute("""
+                UPDATE evidence.search_vector_backfill SET last_id = %s, rows_done = %s
+                WHERE table_name = %s
+            """, (last_id, rows_done, table))
+            conn.commit()
+            print(f"   {table}: {rows_done} rows (through id {last_id})")
+            if pause:
+                time.sleep(pause)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ {table}: backfilled {rows_done} rows in {elapsed:.1f}s")
+    return rows_done
+
+def migrate(conn, chunk_size=None, pause=0.0, restart=False):
+    """Install triggers, then backfill both tables"""
+    chunk_size = chunk_size or int(os.getenv('SEARCH_BACKFILL_CHUNK', 1000))
+    install_search_triggers(conn)
+    print("✅ Search vector triggers installed")
+    for table in BACKFILL_EXPRESSIONS:
+        backfill_table(conn, table, chunk_size, pause, restart)
+
+def main():
+    parser = argparse.ArgumentParser(description="Install weighted search vector triggers and backfill existing rows")
+    parser.add_argument('--chunk-size', type=int, help="Rows per committed chunk (default: SEARCH_BACKFILL_CHUNK or 1000)")
+    parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between chunks")
+    parser.add_argument('--restart', action='store_true', help="Ignore saved progress and backfill from the start")
+    parser.add_argument('--install-only', action='store_true', help="Only create the triggers")
+    args = parser.parse_args()
+
+    from load_evidence_data import connect_db
+    conn = connect_db()
+    if not conn:
+        sys.exit(1)
+    try:
+        if args.install_only:
+            install_search_triggers(conn)
+            print("✅ Search vector triggers installed")
+        else:
+            migrate(conn, args.chunk_size, args.pause, args.restart)
+    except Exception as e:
+        conn.rollback()
+        print(f"❌ Search vector migration failed: {e}")
+        sys.exit(1)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Zero-Downtime Server Supervisor for VCAT Evidence Repository
+Holds the listening socket and swaps uvicorn worker sets on SIGHUP without refusing connections
+"""
+
+import os
+import sys
+import time
+import signal
+import socket
+import shutil
+import tempfile
+import subprocess
+from pathlib import Path
+
+PID_FILE = os.getenv('SUPERVISOR_PID_FILE', 'server_supervisor.pid')
+
+class ServerSupervisor:
+    def __init__(self, host=None, port=None, workers=None, ready_timeout=None):
+        self.host = host or os.getenv('HOST', '0.0.0.0')
+        self.port = port or int(os.getenv('PORT', 8080))
+        self.workers = workers or int(os.getenv('WEB_WORKERS', 1))
+        self.ready_timeout = ready_timeout or float(os.getenv('READY_TIMEOUT', 60))
+        self.ready_dir = Path(tempfile.mkdtemp(prefix='vcat-ready-'))
+        self.sock = None
+        self.current = []
+        self.reload_requested = False
+        self.stop_requested = False
+
+    def bind(self):
+        """Bind once; every worker generation inherits this socket"""
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((self.host, self.port))
+        self.sock.listen(2048)
+        self.sock.set_inheritable(True)
+        print(f"🔌 Listening on {self.host}:{self.port} (fd {self.sock.fileno()})")
+
+    def spawn_worker(self):
+        """Start one uvicorn worker on the shared socket"""
+        fd = self.sock.fileno()
+        env = {**os.environ, 'VCAT_READY_DIR': str(self.ready_dir)}
+        return subprocess.Popen(
+            [sys.executable, '-m', 'uvicorn', 'main:app', '--fd', str(fd)],
+            pass_fds=(fd,), env=env
+        )
+
+    def spawn_workers(self):
+        """Start a new worker set"""
+        return [self.spawn_worker() for _ in range(self.workers)]
+
+    def wait_until_ready(self, workers):
+        """Wait for each worker to finish warm-up (it writes VCAT_READY_DIR/<pid>)"""
+        deadline = time.time() + self.ready_timeout
+        while time.time() < deadline:
+            if any(w.poll() is not None for w in workers):
+                return False
+            if all((self.ready_dir / str(w.pid)).exists() for w in workers):
+                return True
+            time.sleep(0.2)
+        return False
+
+    def drain(self, workers):
+        """SIGTERM lets uvicorn finish in-flight requests before exiting"""
+        for worker in workers:
+            if worker.poll() is None:
+                worker.send_signal(signal.SIGTERM)
+        for worker in workers:
+            try:
+                worker.wait(timeout=self.ready_timeout)
+            except subprocess.TimeoutExpired:
+                worker.kill()
+            (self.ready_dir / str(worker.pid)).unlink(missing_ok=True)
+
+    def reload(self):
+        """Start a new worker set, and drain the old one only once the new one is ready"""
+        print("🔄 Graceful reload: starting new workers...")
+        new_workers = self.spawn_workers()
+        if not self.wait_until_ready(new_workers):
+            print("❌ New workers failed readiness, keeping current workers")
+            self.drain(new_workers)
+            return False
+
+        old_workers, self.current = self.current, new_workers
+        print(f"✅ New workers ready ({', '.join(str(w.pid) for w in new_workers)}), draining old workers")
+        self.drain(old_workers)
+        return True
+
+    def _on_hup(self, signum, frame):
+        self.reload_requested = True
+
+    def _on_term(self, signum, frame):
+        self.stop_requested = True
+
+    def run(self):
+        self.bind()
+        Path(PID_FILE).write_text(str(os.getpid()))
+        signal.signal(signal.SIGHUP, self._on_hup)
+        signal.signal(signal.SIGTERM, self._on_term)
+        signal.signal(signal.SIGINT, self._on_term)
+
+        self.current = self.spawn_workers()
+        if not self.wait_until_ready(self.current):
+            print("⚠️ Initial workers not ready yet, serving anyway")
+
+        try:
+            while not self.stop_requested:
+                if self.reload_requested:
+                    self.reload_requested = False
+                    self.reload()
+                # Replace workers that died unexpectedly
+                for index, worker in enumerate(self.current):
+                    if worker.poll() is not None:
+                        print(f"⚠️ Worker {worker.pid} exited ({worker.returncode}), restarting")
+                        self.current[index] = self.spawn_worker()
+                        break
+                time.sleep(0.5)
+        finally:
+            print("🛑 Stopping workers...")
+            self.drain(self.current)
+            self.sock.close()
+            Path(PID_FILE).unlink(missing_ok=True)
+            shutil.rmtree(self.ready_dir, ignore_errors=True)
+
+def get_supervisor_pid():
+    """PID of the running supervisor, or None"""
+    try:
+        pid = int(Path(PID_FILE).read_text().strip())
+        os.kill(pid, 0)
+        return pid
+    except (FileNotFoundError, ValueError, ProcessLookupError, PermissionError):
+        return None
+
+def request_reload():
+    """Ask a running supervisor for a graceful reload; False if none is running"""
+    pid = get_supervisor_pid()
+    if pid is None:
+        return False
+    os.kill(pid, signal.SIGHUP)
+    return True
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--reload":
+        if request_reload():
+            print("✅ Reload requested")
+            sys.exit(0)
+        print("❌ No running supervisor found")
+        sys.exit(1)
+
+    ServerSupervisor().run()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Single-Flight Locking for VCAT Evidence Repository
+Cross-process coalescing of sync/deploy runs: at most one active, one pending
+"""
+
+import os
+import fcntl
+import functools
+import threading
+from pathlib import Path
+
+class Coalesced:
+    """
+    Returned instead of a result when a trigger collapsed into the pending run:
+    nothing ran. Falsy, so it is never mistaken for success; compare with `is COALESCED`.
+    """
+
+    def __bool__(self):
+        return False
+
+    def __repr__(self):
+        return "COALESCED"
+
+COALESCED = Coalesced()
+
+class SingleFlight:
+    """
+    Two flock()ed files per name:
+    - pending.lock: held by the one trigger waiting for its turn
+    - active.lock:  held by the run in progress
+    A trigger that cannot take the pending slot collapses into the waiting run,
+    which starts after the current one and therefore sees the same changes.
+    """
+
+    def __init__(self, name, lock_dir=None):
+        self.name = name
+        self.lock_dir = Path(lock_dir or os.getenv('SINGLE_FLIGHT_DIR', '.locks'))
+        self._local = threading.local()
+
+    def _open(self, suffix):
+        self.lock_dir.mkdir(parents=True, exist_ok=True)
+        return open(self.lock_dir / f"{self.name}.{suffix}.lock", 'a+')
+
+    def run(self, fn, *args, **kwargs):
+        """Run fn under the lock, or return COALESCED if a run is already pending"""
+        # Nested calls (e.g. full_update_cycle -> sync_from_github) reuse the held lock
+        if getattr(self._local, 'depth', 0) > 0:
+            return self._call(fn, *args, **kwargs)
+
+        pending = self._open('pending')
+        try:
+            fcntl.flock(pending, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            pending.close()
+            print(f"ℹ️ {self.name}: a run is already pending, trigger coalesced")
+            return COALESCED
+
+        active = self._open('active')
+        try:
+            # Wait for the active run to finish, then free the pending slot
+            fcntl.flock(active, fcntl.LOCK_EX)
+            fcntl.flock(pending, fcntl.LOCK_UN)
+            pending.close()
+            pending = None
+
+            active.seek(0)
+            active.truncate()
+            active.write(f"{os.getpid()}\n")
+            active.flush()
+
+            return self._call(fn, *args, **kwargs)
+        finally:
+            if pending is not None:
+                pending.close()
+            fcntl.flock(active, fcntl.LOCK_UN)
+            active.close()
+
+    def _call(self, fn, *args, **kwargs):
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            self._local.depth -= 1
+
+    def is_active(self):
+        """True if some process currently holds the active lock"""
+        active = self._open('active')
+        try:
+            fcntl.flock(active, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fcntl.flock(active, fcntl.LOCK_UN)
+            return False
+        except BlockingIOError:
+            return True
+        finally:
+            active.close()
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+def get_single_flight(name):
+    """Process-wide SingleFlight per name"""
+    with _flights_lock:
+        if name not in _flights:
+            _flights[name] = SingleFlight(name)
+        return _flights[name]
+
+def single_flight(name):
+    """Decorator: coalesce concurrent calls across processes under one lock name"""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return get_single_flight(name).run(fn, *args, **kwargs)
+        return wrapper
+    return decorator
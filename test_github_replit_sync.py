@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+GitHub version check tests against a local stand-in API server
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+pytest.importorskip("psycopg2")
+
+COMMIT = {
+    'sha': 'abcdef1234567890',
+    'commit': {
+        'message': 'Evidence data update',
+        'committer': {'date': '2025-08-01T10:00:00Z'},
+        'author': {'name': 'ck999kk'}
+    }
+}
+
+class StandInGitHub(BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def do_GET(self):
+        StandInGitHub.requests_seen.append((self.path, self.headers.get('If-None-Match')))
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(COMMIT).encode()
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def github_server(monkeypatch, tmp_path):
+    server = HTTPServer(('127.0.0.1', 0), StandInGitHub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    StandInGitHub.requests_seen = []
+    monkeypatch.setenv('GITHUB_API_URL', f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setenv('GITHUB_COMMIT_CACHE', str(tmp_path / 'commit_cache.json'))
+    yield server
+    server.shutdown()
+
+def test_latest_commit_uses_etag_and_disk_cache(github_server):
+    from github_replit_sync import GitHubReplitSync
+
+    first = GitHubReplitSync().get_latest_github_commit()
+    second = GitHubReplitSync().get_latest_github_commit()
+
+    assert first == second
+    assert first['sha'] == 'abcdef12'
+    assert [etag for _, etag in StandInGitHub.requests_seen] == [None, '"v1"']
+    assert StandInGitHub.requests_seen[0][0] == '/repos/ck999kk/VCAT-Evidence-Repository/commits/main'
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+HTML extractors must return exactly the text BeautifulSoup produced before
+"""
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("bs4")
+
+from html_text import BeautifulSoupExtractor, LxmlExtractor, StreamingExtractor
+
+EVIDENCE_HTML = sorted((Path(__file__).resolve().parent / "GMAIL_EVIDENCE").rglob("*.html"))
+
+SNIPPETS = [
+    "<html><head><title>Order</title><style>p{}</style><script>var a = 1</script></head>"
+    "<body><p>Hearing &amp; orders&nbsp;&copy;</p><br>next<template>t</template></body></html>",
+    "<p>before<!-- comment -->after</p>",
+    "<div><b>unclosed</div>tail",
+    "<!DOCTYPE html><p>  spaced   text </p>",
+    "",
+]
+
+def extractors():
+    found = [StreamingExtractor()]
+    try:
+        found.append(LxmlExtractor())
+    except ImportError:
+        pass
+    return found
+
+@pytest.mark.parametrize("extractor", extractors(), ids=lambda e: e.name)
+def test_matches_beautifulsoup_on_snippets(extractor):
+    reference = BeautifulSoupExtractor()
+    for html in SNIPPETS:
+        assert extractor.extract(html) == reference.extract(html)
+
+@pytest.mark.parametrize("extractor", extractors(), ids=lambda e: e.name)
+def test_matches_beautifulsoup_on_evidence(extractor):
+    if not EVIDENCE_HTML:
+        pytest.skip("no evidence HTML in this checkout")
+    reference = BeautifulSoupExtractor()
+    for path in EVIDENCE_HTML:
+        html = path.read_text(encoding='utf-8', errors='ignore')
+        assert extractor.extract(html) == reference.extract(html), path.name
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Streaming MIME parser must agree with the stdlib parser on bodies and attachments
+"""
+
+import email
+import hashlib
+from email.message import EmailMessage
+from pathlib import Path
+
+from mime_stream import ContentStore, parse_email_stream
+
+EVIDENCE_EML = sorted((Path(__file__).resolve().parent / "GMAIL_EVIDENCE" / "All_Case_Parties_EML").glob("*.eml"))
+
+def stdlib_attachment_hashes(path):
+    message = email.message_from_bytes(path.read_bytes())
+    hashes = []
+    for part in message.walk():
+        if part.is_multipart():
+            continue
+        disposition = (part.get('Content-Disposition') or '').split(';')[0].strip().lower()
+        if part.get_filename() or disposition == 'attachment' or part.get_content_maintype() != 'text':
+            payload = part.get_payload(decode=True)
+            if payload:
+                hashes.append(hashlib.sha256(payload).hexdigest())
+    return hashes
+
+def test_nested_multipart_with_attachment(tmp_path):
+    message = EmailMessage()
+    message['Subject'] = 'Water damage photos'
+    message['From'] = 'renter@example.com'
+    message.set_content('Plain body')
+    message.add_alternative('<p>HTML body</p>', subtype='html')
+    payload = bytes(range(256)) * 4096
+    message.add_attachment(payload, maintype='application', subtype='pdf', filename='../order.pdf')
+
+    path = tmp_path / 'message.eml'
+    path.write_bytes(bytes(message))
+    parsed = parse_email_stream(path, ContentStore(tmp_path / 'store'))
+
+    assert parsed.headers['Subject'] == 'Water damage photos'
+    assert ''.join(parsed.plain).strip() == 'Plain body'
+    assert '<p>HTML body</p>' in ''.join(parsed.html)
+    [attachment] = parsed.attachments
+    assert attachment['filename'] == 'order.pdf'
+    assert attachment['file_hash'] == hashlib.sha256(payload).hexdigest()
+    assert Path(attachment['path']).read_bytes() == payload
+
+def test_matches_stdlib_on_evidence(tmp_path):
+    store = ContentStore(tmp_path / 'store')
+    for path in EVIDENCE_EML:
+        parsed = parse_email_stream(path, store)
+        assert [a['file_hash'] for a in parsed.attachments] == stdlib_attachment_hashes(path), path.name
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+MinHash signatures and LSH buckets used for near-duplicate clustering
+"""
+
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("psycopg2")
+pytest.importorskip("bs4")
+
+from load_evidence_data import parse_email_file, parse_html_file
+from mime_stream import ContentStore
+from near_duplicates import NEAR_DUP_THRESHOLD, lsh_buckets, minhash, similarity
+
+GMAIL_EVIDENCE = Path(__file__).resolve().parent / "GMAIL_EVIDENCE"
+# One message as exported twice: the raw .eml and Gmail's HTML rendering
+PAIR = "20250416-Re_Urgent_ Water Damage on Bedroom Wall (Unit 1803-101"
+
+BODY = (
+    "Dear Hilary and Sylvia, I am writing again about the water damage on the bedroom wall of "
+    "unit 1803. The stain has spread since my last email and the carpet near the window is now "
+    "damp. Please arrange for a plumber to inspect the leak this week and confirm a time with me. "
+    "Kind regards, Chawakorn"
+)
+
+def email_item_text(parsed):
+    """Email text laid out as near_duplicates.ITEMS_SQL does for evidence.emails"""
+    return ' '.join([parsed['subject'], 'Subject:', parsed['subject'], 'From:', parsed['sender'],
+                     'Date: To:', parsed['recipient'], parsed['body']])
+
+def test_eml_and_html_export_match(tmp_path):
+    parsed = parse_email_file(GMAIL_EVIDENCE / "All_Case_Parties_EML" / f"{PAIR}.eml", store=ContentStore(tmp_path))
+    html = parse_html_file(GMAIL_EVIDENCE / "All_Case_Parties_HTML" / f"{PAIR}.html")
+    plain, rendered = minhash(email_item_text(parsed)), minhash(html['content'])
+    assert similarity(plain, rendered) >= NEAR_DUP_THRESHOLD
+    assert set(lsh_buckets(plain)) & set(lsh_buckets(rendered))
+
+def test_unrelated_text_differs():
+    other = ("Receipt of payment for 1803/243 Franklin Street. We confirm receipt of your rent "
+             "payment for the period ending 30 June. This is an automated message.")
+    assert similarity(minhash(BODY), minhash(other)) < 0.2
+
+def test_empty_text_has_no_signature():
+    assert minhash("  --  ") is None
+    assert similarity(minhash(BODY), minhash(BODY)) == 1.0
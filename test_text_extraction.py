@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Documents with failed parts must not be cached, so the next extraction retries them
+"""
+
+import text_extraction
+from text_extraction import ExtractCache, extract_texts
+
+class FlakyText:
+    """Two parts; part 1 fails until `broken` is cleared"""
+    broken = True
+
+    @staticmethod
+    def parts(path):
+        return [0, 1]
+
+    @classmethod
+    def extract(cls, path, part, timeout=None):
+        if part == 1 and cls.broken:
+            raise OSError("unreadable page")
+        return f"page {part + 1}"
+
+def test_failed_part_is_requeued(tmp_path, monkeypatch):
+    monkeypatch.setitem(text_extraction.TEXT_EXTRACTORS, 'flaky', FlakyText)
+    cache = ExtractCache(tmp_path / "cache")
+    source = tmp_path / "statement.flaky"
+    source.write_bytes(b"")
+    documents = [('abc123', source, 'flaky')]
+
+    results = []
+    extract_texts(documents, lambda *args: results.append(args), workers=1, cache=cache)
+    file_hash, text, result = results[-1]
+    assert text == "page 1"
+    assert list(result['errors']) == ['1']
+    assert cache.get('abc123') is None
+
+    monkeypatch.setattr(FlakyText, 'broken', False)
+    extract_texts(documents, lambda *args: results.append(args), workers=1, cache=cache)
+    file_hash, text, result = results[-1]
+    assert text == "page 1\n\npage 2"
+    assert not result['errors']
+    assert cache.get('abc123')['text'] == text
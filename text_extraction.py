@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Attachment Text Extraction for VCAT Evidence Repository
+Splits documents into parts (PDF pages, whole DOCX files, images for OCR), extracts them in a process pool
+with per-part timeouts and memory caps, and caches results by file_hash
+"""
+
+import os
+import json
+import time
+import signal
+import threading
+import multiprocessing
+from pathlib import Path
+from contextlib import contextmanager
+
+from ingest_pipeline import ParsePipeline
+
+EXTRACT_CACHE_DIR = os.getenv('EXTRACT_CACHE_DIR', '.extract_cache')
+PART_TIMEOUT = float(os.getenv('EXTRACT_PART_TIMEOUT', 30))
+MEMORY_LIMIT_MB = int(os.getenv('EXTRACT_MEMORY_MB', 2048))
+
+class ExtractionTimeout(Exception):
+    pass
+
+@contextmanager
+def time_limit(seconds):
+    """Raise ExtractionTimeout after `seconds` (SIGALRM; only on a process's main thread)"""
+    if not seconds or threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def expired(signum, frame):
+        raise ExtractionTimeout(f"timed out after {seconds:g}s")
+
+    previous = signal.signal(signal.SIGALRM, expired)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+def init_extract_worker(memory_mb):
+    """
+    Pool initializer: cap a worker's address space so one bad file can't
+    exhaust the host, and keep tesseract single-threaded so the pool size
+    bounds CPU use
+    """
+    if multiprocessing.parent_process() is None:
+        return
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+    if not memory_mb:
+        return
+    try:
+        import resource
+        limit = memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError):
+        pass
+
+class PdfText:
+    """One part per page; pdfplumber with a PyPDF2 fallback"""
+
+    def parts(self, path):
+        try:
+            import pdfplumber
+            with pdfplumber.open(path) as pdf:
+                return list(range(len(pdf.pages)))
+        except ImportError:
+            from PyPDF2 import PdfReader
+            return list(range(len(PdfReader(str(path)).pages)))
+
+    def extract(self, path, page_number, timeout=None):
+        try:
+            import pdfplumber
+        except ImportError:
+            from PyPDF2 import PdfReader
+            return PdfReader(str(path)).pages[page_number].extract_text() or ''
+        with pdfplumber.open(path, pages=[page_number + 1]) as pdf:
+            return pdf.pages[0].extract_text() or ''
+
+class DocxText:
+    """Single part: paragraphs and table rows in document order (python-docx)"""
+
+    def parts(self, path):
+        return [0]
+
+    def extract(self, path, part, timeout=None):
+        from docx import Document
+        return '\n'.join(self.iter_lines(Document(str(path))))
+
+    @staticmethod
+    def iter_lines(document):
+        from docx.oxml.ns import qn
+        from docx.table import Table
+        from docx.text.paragraph import Paragraph
+
+        for child in document.element.body.iterchildren():
+            if child.tag == qn('w:p'):
+                text = Paragraph(child, document).text
+                if text.strip():
+                    yield text
+            elif child.tag == qn('w:tbl'):
+                for row in Table(child, document).rows:
+                    # Merged cells repeat the same underlying cell; keep it once
+                    cells, seen = [], set()
+                    for cell in row.cells:
+                        if id(cell._tc) in seen:
+                            continue
+                        seen.add(id(cell._tc))
+                        text = ' '.join(cell.text.split())
+                        if text:
+                            cells.append(text)
+                    if cells:
+                        yield ' | '.join(cells)
+
+class ImageOcr:
+    """
+    Local OCR with tesseract (pytesseract; no network). Images are pre-scaled
+    before recognition: JPEGs are decoded at reduced size, large photos are
+    shrunk to OCR_MAX_SIDE, small screenshots are enlarged, and blank images
+    are skipped. Returns per-image mean word confidence alongside the text.
+    """
+
+    def __init__(self):
+        self.language = os.getenv('OCR_LANG', 'eng')
+        self.max_side = int(os.getenv('OCR_MAX_SIDE', 2400))
+        self.min_side = int(os.getenv('OCR_MIN_SIDE', 600))
+
+    def parts(self, path):
+        return [0]
+
+    def prepare(self, path):
+        """Grayscale image scaled for recognition, or None if there is nothing to read"""
+        from PIL import Image, ImageStat
+
+        image = Image.open(path)
+        original_size = image.size
+        if image.format == 'JPEG' and max(image.size) > self.max_side:
+            # DCT scaling: decode at 1/2, 1/4 or 1/8 size instead of full resolution
+            scale = max(image.size) / self.max_side
+            image.draft('L', (int(image.width / scale), int(image.height / scale)))
+
+        if image.mode in ('RGBA', 'LA', 'P'):
+            # Transparent screenshot regions would otherwise turn black
+            image = image.convert('RGBA')
+            background = Image.new('RGBA', image.size, (255, 255, 255, 255))
+            image = Image.alpha_composite(background, image)
+        image = image.convert('L')
+
+        if min(image.size) < 16 or ImageStat.Stat(image).stddev[0] < 4:
+            return None, original_size
+
+        longest = max(image.size)
+        if longest > self.max_side:
+            factor = self.max_side / longest
+            image = image.resize((round(image.width * factor), round(image.height * factor)),
+                                 Image.BILINEAR, reducing_gap=2.0)
+        elif longest < self.min_side:
+            image = image.resize((image.width * 2, image.height * 2), Image.BICUBIC)
+        return image, original_size
+
+    def extract(self, path, part, timeout=None):
+        import pytesseract
+
+        deadline = time.monotonic() + timeout if timeout else None
+        image, original_size = self.prepare(path)
+        meta = {'size': list(original_size)}
+        if image is None:
+            meta.update(confidence=None, words=0, skipped='blank')
+            return '', meta
+
+        # pytesseract kills tesseract on its own timeout a second before the part's
+        # SIGALRM would fire, so an interrupted part leaves no orphaned process
+        ocr_timeout = max(deadline - time.monotonic() - 1, 0.1) if deadline else 0
+        try:
+            data = pytesseract.image_to_data(image, lang=self.language, config='--oem 1 --psm 3',
+                                             output_type=pytesseract.Output.DICT, timeout=ocr_timeout)
+        except RuntimeError as e:
+            if 'timeout' not in str(e).lower():
+                raise
+            raise ExtractionTimeout(f"tesseract timed out after {ocr_timeout:.1f}s")
+        lines = {}
+        confidences = []
+        for i, word in enumerate(data['text']):
+            word = word.strip()
+            confidence = float(data['conf'][i])
+            if not word or confidence < 0:
+                continue
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(key, []).append(word)
+            confidences.append(confidence)
+
+        meta.update(ocr_size=list(image.size), words=len(confidences),
+                    confidence=round(sum(confidences) / len(confidences), 1) if confidences else None)
+        return '\n'.join(' '.join(words) for words in lines.values()), meta
+
+# Attachment file_type (suffix) -> extractor
+TEXT_EXTRACTORS = {
+    '.pdf': PdfText(),
+    '.docx': DocxText(),
+    '.png': ImageOcr(),
+    '.jpg': ImageOcr(),
+    '.jpeg': ImageOcr()
+}
+
+# Per-document extraction metadata (OCR confidence, failed parts) next to the row's content
+EXTRACTION_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS evidence.text_extractions (
+    file_hash text PRIMARY KEY,
+    file_type text NOT NULL,
+    parts integer NOT NULL,
+    failed_parts integer NOT NULL DEFAULT 0,
+    confidence real,
+    extracted_at timestamptz NOT NULL DEFAULT NOW()
+)
+"""
+
+def extract_part(file_type, path, part, timeout, file_hash):
+    """Pool worker: text (and metadata) of one part, or an error string"""
+    try:
+        with time_limit(timeout):
+            text = TEXT_EXTRACTORS[file_type].extract(path, part, timeout=timeout)
+        meta = None
+        if isinstance(text, tuple):
+            text, meta = text
+        return file_hash, part, text, meta, None
+    except ExtractionTimeout as e:
+        return file_hash, part, None, None, str(e)
+    except MemoryError:
+        return file_hash, part, None, None, "memory limit exceeded"
+    except Exception as e:
+        return file_hash, part, None, None, f"{type(e).__name__}: {e}"
+
+class ExtractCache:
+    """Extraction results on disk, one JSON file per file_hash"""
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory or EXTRACT_CACHE_DIR)
+
+    def _path(self, file_hash):
+        return self.directory / file_hash[:2] / f"{file_hash}.json"
+
+    def get(self, file_hash):
+        try:
+            with open(self._path(file_hash), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, file_hash, result):
+        path = self._path(file_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+class ExtractStats:
+    def __init__(self):
+        self.documents = 0
+        self.cached = 0
+        self.parts = 0
+        self.failed_parts = 0
+        self.seconds = 0.0
+
+    @property
+    def parts_per_second(self):
+        return self.parts / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.documents} documents ({self.cached} cached), {self.parts} parts "
+                f"({self.failed_parts} failed) in {self.seconds:.2f}s ({self.parts_per_second:.1f} parts/s)")
+
+def extract_texts(documents, on_text, workers=None, timeout=None, memory_mb=None, cache=None, stats=None):
+    """
+    Extract text for [(file_hash, path, file_type)] and call
+    on_text(file_hash, text, result) on the calling thread as each document
+    completes. Cached hashes are never re-extracted; documents with failed
+    parts still get their partial text but are not cached, so they are retried.
+    """
+    cache = cache or ExtractCache()
+    stats = stats if stats is not None else ExtractStats()
+    timeout = PART_TIMEOUT if timeout is None else timeout
+    memory_mb = MEMORY_LIMIT_MB if memory_mb is None else memory_mb
+    start = time.perf_counter()
+
+    misses = []
+    for file_hash, path, file_type in documents:
+        stats.documents += 1
+        cached = cache.get(file_hash)
+        if cached is not None:
+            stats.cached += 1
+            on_text(file_hash, cached['text'], cached)
+        else:
+            misses.append((file_hash, Path(path), file_type))
+
+    pending = {}
+
+    def finish(file_hash):
+        entry = pending.pop(file_hash)
+        for part in entry['parts']:
+            if part not in entry['texts'] and str(part) not in entry['errors']:
+                entry['errors'][str(part)] = "worker exited without a result"
+        texts = [entry['texts'][part] for part in entry['parts'] if entry['texts'].get(part)]
+        # Word-weighted mean over the parts that report a confidence (OCR)
+        scored = [m for m in entry['meta'].values() if m.get('confidence') is not None]
+        words = sum(m.get('words', 0) for m in scored)
+        result = {
+            'file_type': entry['file_type'],
+            'parts': len(entry['parts']),
+            'errors': entry['errors'],
+            'confidence': (round(sum(m['confidence'] * m.get('words', 0) for m in scored) / words, 1)
+                           if words else None),
+            'part_meta': {str(part): meta for part, meta in entry['meta'].items()},
+            # PostgreSQL text columns reject NUL characters
+            'text': '\n\n'.join(texts).replace('\x00', '')
+        }
+        if not entry['errors']:
+            cache.put(file_hash, result)
+        on_text(file_hash, result['text'], result)
+
+    def plan():
+        for file_hash, path, file_type in misses:
+            errors = {}
+            try:
+                parts = TEXT_EXTRACTORS[file_type].parts(path) or []
+            except Exception as e:
+                print(f"❌ Cannot open {path.name}: {e}")
+                parts = []
+                errors['open'] = f"{type(e).__name__}: {e}"
+            pending[file_hash] = {'file_type': file_type, 'parts': parts, 'texts': {}, 'meta': {},
+                                  'errors': errors}
+            for part in parts:
+                yield file_type, path, part, timeout, file_hash
+
+    def collect(item, result):
+        if result is None:
+            return
+        file_hash, part, text, meta, error = result
+        entry = pending[file_hash]
+        if meta:
+            entry['meta'][part] = meta
+        stats.parts += 1
+        if error:
+            stats.failed_parts += 1
+            entry['errors'][str(part)] = error
+            print(f"⚠️ {item[1].name} part {part + 1}: {error}")
+        else:
+            entry['texts'][part] = text
+        if len(entry['texts']) + len(entry['errors']) == len(entry['parts']):
+            finish(file_hash)
+
+    pipeline = ParsePipeline(extract_part, workers=workers,
+                             initializer=init_extract_worker, initargs=(memory_mb,))
+    pipeline.run(plan(), collect)
+
+    # Documents with no extractable parts (empty or unreadable files)
+    for file_hash in list(pending):
+        finish(file_hash)
+
+    stats.seconds += time.perf_counter() - start
+    return stats
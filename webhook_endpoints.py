@@ -6,16 +6,115 @@ GitHub-Replit integration and auto-deployment
 
 from fastapi import Request, HTTPException
 from datetime import datetime
-import threading
+import os
+import time
+import queue
 import json
+import asyncio
 import logging
+from job_queue import get_job_queue
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+def github_sync_job(payload):
+    """Job handler: sync from GitHub"""
+    from github_replit_sync import GitHubReplitSync
+    sync = GitHubReplitSync()
+    return sync.sync_from_github()
+
+def auto_deploy_job(payload):
+    """Job handler: full update cycle"""
+    from auto_deploy import AutoDeploy
+    deployer = AutoDeploy()
+    return deployer.full_update_cycle()
+
+def evidence_update_job(payload):
+    """Job handler: evidence update"""
+    from evidence_updater import EvidenceUpdater
+    updater = EvidenceUpdater()
+    return updater.update_evidence_system()
+
+async def submit_job(job_type, payload=None):
+    """Queue a background job, rejecting with 503 when the queue is full"""
+    try:
+        # Off the event loop: submit waits for the job file lock shared with other workers
+        return await asyncio.to_thread(get_job_queue().submit, job_type, payload)
+    except queue.Full:
+        logger.warning(f"Job queue full, rejecting {job_type}")
+        raise HTTPException(status_code=503, detail="Job queue full, try again later")
+
+# /system/status source limits
+STATUS_SOURCE_TIMEOUT = float(os.getenv('STATUS_SOURCE_TIMEOUT', 2.0))
+GITHUB_VERSION_TTL = float(os.getenv('GITHUB_VERSION_TTL', 300))
+
+# Last GitHub commit lookup, shared by all /system/status calls
+_github_cache = {'value': None, 'fetched_at': 0.0, 'refresh': None}
+
+def database_counts():
+    """Document and email counts over a pooled connection"""
+    from db_pool import pooled_connection
+    with pooled_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT (SELECT COUNT(*) FROM evidence.documents),
+                   (SELECT COUNT(*) FROM evidence.emails)
+        """)
+        counts = cursor.fetchone()
+        cursor.close()
+    return counts
+
+def get_current_version():
+    """Locally deployed version (reads .github_version)"""
+    from github_replit_sync import GitHubReplitSync
+    return GitHubReplitSync().get_current_version()
+
+async def _refresh_github_commit():
+    from github_replit_sync import GitHubReplitSync
+    latest = await asyncio.to_thread(GitHubReplitSync().get_latest_github_commit)
+    if latest:
+        _github_cache['value'] = latest
+        _github_cache['fetched_at'] = time.monotonic()
+    return latest
+
+async def cached_latest_github_commit():
+    """Latest GitHub commit with a TTL; stale values are served while one refresh runs"""
+    cached = _github_cache['value']
+    if cached and time.monotonic() - _github_cache['fetched_at'] < GITHUB_VERSION_TTL:
+        return cached
+    
+    refresh = _github_cache['refresh']
+    if refresh is None or refresh.done():
+        refresh = _github_cache['refresh'] = asyncio.ensure_future(_refresh_github_commit())
+    
+    if cached:
+        return cached
+    return await asyncio.shield(refresh)
+
+async def timed_source(source):
+    """Run one status source with a timeout; returns (value, error, elapsed_ms)"""
+    start = time.perf_counter()
+    try:
+        if asyncio.iscoroutinefunction(source):
+            value = await asyncio.wait_for(source(), STATUS_SOURCE_TIMEOUT)
+        else:
+            value = await asyncio.wait_for(asyncio.to_thread(source), STATUS_SOURCE_TIMEOUT)
+        error = None
+    except asyncio.TimeoutError:
+        value, error = None, f"timed out after {STATUS_SOURCE_TIMEOUT}s"
+    except Exception as e:
+        value, error = None, str(e)
+    return value, error, round((time.perf_counter() - start) * 1000, 1)
+
 def setup_webhook_endpoints(app):
     """Add webhook endpoints to FastAPI app"""
     
+    jobs = get_job_queue()
+    jobs.register('github_sync', github_sync_job)
+    jobs.register('auto_deploy', auto_deploy_job)
+    jobs.register('evidence_update', evidence_update_job)
+    jobs.start()
+    
     @app.post("/webhook/github")
     async def github_webhook(request: Request):
         """GitHub webhook for instant updates"""
@@ -31,27 +130,20 @@ def setup_webhook_endpoints(app):
                     'timestamp': datetime.now().isoformat()
                 }
                 
-                # Trigger sync in background
-                def sync_task():
-                    try:
-                        from github_replit_sync import GitHubReplitSync
-                        sync = GitHubReplitSync()
-                        result = sync.sync_from_github()
-                        logger.info(f"GitHub sync completed: {result}")
-                    except Exception as e:
-                        logger.error(f"GitHub sync failed: {e}")
-                
-                sync_thread = threading.Thread(target=sync_task, daemon=True)
-                sync_thread.start()
+                # Queue sync in background
+                job = await submit_job('github_sync', commit_info)
                 
                 return {
                     "status": "sync_triggered",
+                    "job_id": job['id'],
                     "commit": commit_info,
                     "timestamp": datetime.now().isoformat()
                 }
             
             return {"status": "ignored", "reason": "not_main_branch"}
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"GitHub webhook error: {e}")
             return {"status": "error", "message": str(e)}
@@ -60,25 +152,18 @@ def setup_webhook_endpoints(app):
     async def auto_deploy_webhook(request: Request):
         """Webhook for triggering auto-deployment"""
         try:
-            # Trigger full deployment cycle in background
-            def deploy_task():
-                try:
-                    from auto_deploy import AutoDeploy
-                    deployer = AutoDeploy()
-                    result = deployer.full_update_cycle()
-                    logger.info(f"Auto-deploy completed: {result}")
-                except Exception as e:
-                    logger.error(f"Auto-deploy failed: {e}")
-            
-            deploy_thread = threading.Thread(target=deploy_task, daemon=True)
-            deploy_thread.start()
+            # Queue full deployment cycle in background
+            job = await submit_job('auto_deploy')
             
             return {
                 "status": "deployment_triggered",
+                "job_id": job['id'],
                 "timestamp": datetime.now().isoformat(),
-                "message": "Full update cycle started in background"
+                "message": "Full update cycle queued in background"
             }
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Auto-deploy webhook error: {e}")
             return {"status": "error", "message": str(e)}
@@ -89,77 +174,69 @@ def setup_webhook_endpoints(app):
         try:
             payload = await request.json()
             
-            # Trigger evidence update in background
-            def evidence_task():
-                try:
-                    from evidence_updater import EvidenceUpdater
-                    updater = EvidenceUpdater()
-                    result = updater.update_evidence_system()
-                    logger.info(f"Evidence update completed: {result}")
-                except Exception as e:
-                    logger.error(f"Evidence update failed: {e}")
-            
-            evidence_thread = threading.Thread(target=evidence_task, daemon=True)
-            evidence_thread.start()
+            # Queue evidence update in background
+            job = await submit_job('evidence_update', payload)
             
             return {
                 "status": "evidence_update_triggered",
+                "job_id": job['id'],
                 "timestamp": datetime.now().isoformat(),
-                "message": "Evidence update started in background"
+                "message": "Evidence update queued in background"
             }
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Evidence update webhook error: {e}")
             return {"status": "error", "message": str(e)}
 
+    @app.get("/system/jobs")
+    async def system_jobs(limit: int = 20, status: str = None):
+        """List background jobs with status and timing"""
+        # The job file is read under a cross-process lock; keep that off the event loop
+        stats, recent = await asyncio.gather(
+            asyncio.to_thread(jobs.stats),
+            asyncio.to_thread(jobs.list_jobs, limit=limit, status=status)
+        )
+        return {
+            "queue": stats,
+            "jobs": recent,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    @app.get("/system/jobs/{job_id}")
+    async def system_job(job_id: str):
+        """Get a single background job"""
+        job = await asyncio.to_thread(jobs.get, job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+        return job
+
     @app.get("/system/status")
     async def system_status():
         """Get comprehensive system status"""
         try:
-            # Import here to avoid circular imports
-            from auto_deploy import AutoDeploy
-            import psycopg2
-            
-            deployer = AutoDeploy()
-            
-            # System health
-            healthy, health_msg = deployer.check_system_health()
-            
-            # Database stats
-            try:
-                db_config = {
-                    'host': 'localhost',
-                    'database': 'vcat',
-                    'user': 'vcat',
-                    'password': 'secret123',
-                    'port': 5432
-                }
-                conn = psycopg2.connect(**db_config)
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM evidence.documents")
-                doc_count = cursor.fetchone()[0]
-                cursor.execute("SELECT COUNT(*) FROM evidence.emails")
-                email_count = cursor.fetchone()[0]
-                cursor.close()
-                conn.close()
+            # Gather every source concurrently, each bounded by its own timeout
+            (counts, db_error, db_ms), (current_version, _, _), (latest_github, gh_error, gh_ms), (job_stats, _, _) = await asyncio.gather(
+                timed_source(database_counts),
+                timed_source(get_current_version),
+                timed_source(cached_latest_github_commit),
+                timed_source(jobs.stats)
+            )
+            
+            # System health (same rule as AutoDeploy.check_system_health)
+            if db_error:
+                doc_count = email_count = 0
+                db_status = f"error: {db_error}"
+                healthy, health_msg = False, f"Health check failed: {db_error}"
+            else:
+                doc_count, email_count = counts
                 db_status = "connected"
-            except Exception as e:
-                doc_count = 0
-                email_count = 0
-                db_status = f"error: {e}"
-            
-            # GitHub version info
-            try:
-                from github_replit_sync import GitHubReplitSync
-                sync = GitHubReplitSync()
-                current_version = sync.get_current_version()
-                latest_github = sync.get_latest_github_commit()
-                up_to_date = (current_version and latest_github and 
-                             current_version.get('sha') == latest_github.get('sha'))
-            except Exception as e:
-                current_version = None
-                latest_github = None
-                up_to_date = None
+                healthy = doc_count > 0
+                health_msg = f"System healthy - {doc_count} documents" if healthy else "Database empty"
+            
+            up_to_date = (current_version and latest_github and 
+                         current_version.get('sha') == latest_github.get('sha'))
             
             return {
                 "system_health": {
@@ -175,13 +252,19 @@ def setup_webhook_endpoints(app):
                 "version": {
                     "current": current_version,
                     "latest_github": latest_github,
-                    "up_to_date": up_to_date
+                    "up_to_date": up_to_date,
+                    "error": gh_error
+                },
+                "timings_ms": {
+                    "database": db_ms,
+                    "github": gh_ms
                 },
                 "webhooks": {
                     "github": "/webhook/github",
                     "auto_deploy": "/webhook/auto-deploy",
                     "evidence_update": "/webhook/evidence-update"
                 },
+                "jobs": job_stats,
                 "timestamp": datetime.now().isoformat()
             }
             
@@ -193,22 +276,17 @@ def setup_webhook_endpoints(app):
     async def system_logs(limit: int = 20):
         """Get system deployment logs"""
         try:
-            from pathlib import Path
-            import json
+            from deploy_log import DeployLog
             
-            log_file = Path("deploy_log.json")
-            if not log_file.exists():
+            deploy_log = DeployLog()
+            if not deploy_log.exists():
                 return {"logs": [], "message": "No logs found"}
             
-            with open(log_file, 'r') as f:
-                logs = json.load(f)
-            
-            # Return last N logs
-            recent_logs = logs[-limit:] if len(logs) > limit else logs
+            # Tail the last N entries without parsing the whole log
+            recent_logs = await asyncio.to_thread(deploy_log.tail, limit)
             
             return {
                 "logs": recent_logs,
-                "total_logs": len(logs),
                 "showing": len(recent_logs)
             }
             